@@ -0,0 +1,445 @@
+from collections import deque
+from math import sqrt
+import random
+import time
+
+METRICS = ["power", "probability", "f0", "f1", "f2"]
+
+# (low, high, bins) per metric, values outside the range land in the edge bins
+SKETCH_RANGES = {
+    "power": (0, 60, 240),
+    "probability": (0, 1, 100),
+    "f0": (0, 5000, 250),
+    "f1": (0, 5000, 250),
+    "f2": (0, 5000, 250),
+}
+
+SIGNIFICANCE_Z = 1.96
+MIN_SAMPLES = 5
+
+NOISE_FLOOR_SAMPLE_SIZE = 1000
+NOISE_FLOOR_QUANTILES = [0.5, 0.9, 0.99]
+
+DRIFT_METRICS = ["power", "probability"]
+DRIFT_BASELINE_SIZE = 50
+DRIFT_WINDOW_SIZE = 30
+# Alert above DRIFT_Z, clear below DRIFT_CLEAR_Z so alerts don't flicker
+DRIFT_Z = 3.0
+DRIFT_CLEAR_Z = 2.0
+
+# Intervals above GAP_FACTOR x the nominal hop are gaps, above PAUSE_SECONDS the stream was restarted
+FRAME_TIMING_WINDOW = 500
+FRAME_TIMING_GAP_FACTOR = 1.5
+FRAME_TIMING_PAUSE_SECONDS = 1.0
+FRAME_TIMING_HOP_REFRESH = 100
+FRAME_TIMING_MAX_GAPS = 200
+
+class QuantileSketch:
+    """
+    Fixed-width histogram. O(1) to update, mergeable across sessions,
+    and quantiles are accurate to one bin width.
+    """
+    def __init__(self, low: float, high: float, bins: int, counts: list[int] = None):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.width = (high - low) / bins
+        self.counts = counts if counts is not None else [0] * bins
+        self.total = sum(self.counts)
+
+    @classmethod
+    def for_metric(cls, metric: str) -> "QuantileSketch":
+        return cls(*SKETCH_RANGES[metric])
+
+    def add(self, value: float):
+        index = int((value - self.low) / self.width)
+        if index < 0:
+            index = 0
+        elif index >= self.bins:
+            index = self.bins - 1
+        self.counts[index] += 1
+        self.total += 1
+
+    def merge(self, other: "QuantileSketch"):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total += other.total
+
+    def quantile(self, q: float) -> float | None:
+        if not self.total:
+            return None
+        target = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                # Interpolate within the bin
+                fraction = 1 - (seen - target) / count
+                return self.low + (i + fraction) * self.width
+        return self.high
+
+    def clear(self):
+        self.counts = [0] * self.bins
+        self.total = 0
+
+    def to_dict(self) -> dict:
+        return {"low": self.low, "high": self.high, "bins": self.bins, "counts": self.counts}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        return cls(data["low"], data["high"], data["bins"], list(data["counts"]))
+
+def mean_and_variance(count: int, total: float, total_sq: float) -> tuple[float, float]:
+    if count == 0:
+        return 0.0, 0.0
+    mean = total / count
+    if count < 2:
+        return mean, 0.0
+    variance = max(0.0, (total_sq - count * mean * mean) / (count - 1))
+    return mean, variance
+
+def welch_z(a: dict, b: dict) -> float | None:
+    """Welch's t statistic for two metric snapshots, treated as a z score for large samples."""
+    if a["count"] < MIN_SAMPLES or b["count"] < MIN_SAMPLES:
+        return None
+    mean_a, var_a = mean_and_variance(a["count"], a["sum"], a["sum_sq"])
+    mean_b, var_b = mean_and_variance(b["count"], b["sum"], b["sum_sq"])
+    error = sqrt(var_a / a["count"] + var_b / b["count"])
+    if error == 0:
+        return None
+    return (mean_b - mean_a) / error
+
+def compare_metric(a: dict | None, b: dict | None) -> dict:
+    empty = {"count": 0, "sum": 0, "sum_sq": 0, "sketch": None}
+    a = a or empty
+    b = b or empty
+    mean_a, _ = mean_and_variance(a["count"], a["sum"], a["sum_sq"])
+    mean_b, _ = mean_and_variance(b["count"], b["sum"], b["sum_sq"])
+    sketch_a = QuantileSketch.from_dict(a["sketch"]) if a.get("sketch") else None
+    sketch_b = QuantileSketch.from_dict(b["sketch"]) if b.get("sketch") else None
+    z = welch_z(a, b)
+
+    return {
+        "mean_a": mean_a if a["count"] else None,
+        "mean_b": mean_b if b["count"] else None,
+        "delta": mean_b - mean_a if a["count"] and b["count"] else None,
+        "p50_a": sketch_a.quantile(0.5) if sketch_a else None,
+        "p50_b": sketch_b.quantile(0.5) if sketch_b else None,
+        "p90_a": sketch_a.quantile(0.9) if sketch_a else None,
+        "p90_b": sketch_b.quantile(0.9) if sketch_b else None,
+        "z": z,
+        "significant": z is not None and abs(z) >= SIGNIFICANCE_Z,
+    }
+
+def compare_sessions(a: dict, b: dict) -> dict:
+    """
+    Compare two session snapshots ({"duration", "stats"}) pattern by pattern.
+    Works from aggregates and sketches only, so cost doesn't depend on session length.
+    """
+    minutes_a = max(a.get("duration") or 0, 1) / 60
+    minutes_b = max(b.get("duration") or 0, 1) / 60
+    stats_a = a.get("stats", {})
+    stats_b = b.get("stats", {})
+    names = list(stats_a) + [name for name in stats_b if name not in stats_a]
+
+    result = {}
+    for name in names:
+        pattern_a = stats_a.get(name, {})
+        pattern_b = stats_b.get(name, {})
+        count_a = pattern_a.get("count", 0)
+        count_b = pattern_b.get("count", 0)
+        if not count_a and not count_b:
+            continue
+        result[name] = {
+            "name": name,
+            "count_a": count_a,
+            "count_b": count_b,
+            "rate_a": count_a / minutes_a,
+            "rate_b": count_b / minutes_b,
+            **{metric: compare_metric(pattern_a.get(metric), pattern_b.get(metric)) for metric in METRICS},
+        }
+    return result
+
+class Rollup:
+    """
+    Per-pattern summaries in fixed time buckets. Appended incrementally,
+    and the oldest buckets are dropped past max_buckets so memory stays constant.
+    """
+    def __init__(self, bucket_seconds: int, max_buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets: deque[dict] = deque(maxlen=max_buckets)
+
+    def _bucket(self, ts: float) -> dict:
+        key = int(ts // self.bucket_seconds)
+        if not self.buckets or self.buckets[-1]["key"] != key:
+            self.buckets.append({"key": key, "started_at": time.time(), "patterns": {}})
+        return self.buckets[-1]
+
+    def add(self, ts: float, name: str, status: str, power: float, probability: float):
+        patterns = self._bucket(ts)["patterns"]
+        entry = patterns.get(name)
+        if entry is None:
+            # min/max start empty, a throttled first value isn't counted
+            entry = patterns[name] = {
+                "count": 0,
+                "grace": 0,
+                "throttled": 0,
+                "power": {"min": float('inf'), "sum": 0, "max": float('-inf')},
+                "probability": {"min": float('inf'), "sum": 0, "max": float('-inf')},
+            }
+
+        if status == "throttled":
+            entry["throttled"] += 1
+            return
+        if status == "grace_detected":
+            entry["grace"] += 1
+
+        entry["count"] += 1
+        for metric, value in (("power", power), ("probability", probability)):
+            summary = entry[metric]
+            if value < summary["min"]:
+                summary["min"] = value
+            if value > summary["max"]:
+                summary["max"] = value
+            summary["sum"] += value
+
+    def series(self) -> list[dict]:
+        return list(self.buckets)
+
+    def clear(self):
+        self.buckets.clear()
+
+class RollingWindow:
+    """Last `size` values with running sums, O(1) per add."""
+    def __init__(self, size: int):
+        self.values: deque[float] = deque(maxlen=size)
+        self.sum = 0.0
+        self.sum_sq = 0.0
+
+    def add(self, value: float):
+        if len(self.values) == self.values.maxlen:
+            oldest = self.values[0]
+            self.sum -= oldest
+            self.sum_sq -= oldest * oldest
+        self.values.append(value)
+        self.sum += value
+        self.sum_sq += value * value
+
+    def full(self) -> bool:
+        return len(self.values) == self.values.maxlen
+
+    def snapshot(self) -> dict:
+        return {"count": len(self.values), "sum": self.sum, "sum_sq": self.sum_sq}
+
+class DriftDetector:
+    """
+    Compares each pattern's recent detections against a baseline taken from
+    its first DRIFT_BASELINE_SIZE detections, e.g. to catch a gain change or a new room.
+    """
+    def __init__(self):
+        self.patterns: dict[str, dict] = {}
+        self.alerts: dict[str, dict] = {}
+
+    def _pattern(self, name: str) -> dict:
+        pattern = self.patterns.get(name)
+        if pattern is None:
+            pattern = self.patterns[name] = {
+                "baseline": {metric: {"count": 0, "sum": 0.0, "sum_sq": 0.0} for metric in DRIFT_METRICS},
+                "recent": {metric: RollingWindow(DRIFT_WINDOW_SIZE) for metric in DRIFT_METRICS},
+            }
+        return pattern
+
+    def add(self, name: str, power: float, probability: float) -> bool:
+        """Returns True when the alert for this pattern changed."""
+        pattern = self._pattern(name)
+        values = {"power": power, "probability": probability}
+
+        if pattern["baseline"]["power"]["count"] < DRIFT_BASELINE_SIZE:
+            for metric, value in values.items():
+                baseline = pattern["baseline"][metric]
+                baseline["count"] += 1
+                baseline["sum"] += value
+                baseline["sum_sq"] += value * value
+            return False
+
+        for metric, value in values.items():
+            pattern["recent"][metric].add(value)
+        if not pattern["recent"]["power"].full():
+            return False
+
+        alert = None
+        for metric in DRIFT_METRICS:
+            baseline = pattern["baseline"][metric]
+            recent = pattern["recent"][metric].snapshot()
+            z = welch_z(baseline, recent)
+            if z is None:
+                continue
+            limit = DRIFT_CLEAR_Z if name in self.alerts else DRIFT_Z
+            if abs(z) >= limit and (alert is None or abs(z) > abs(alert["z"])):
+                alert = {
+                    "name": name,
+                    "metric": metric,
+                    "baseline_mean": baseline["sum"] / baseline["count"],
+                    "recent_mean": recent["sum"] / recent["count"],
+                    "z": z,
+                }
+
+        previous = self.alerts.get(name)
+        if alert is None:
+            if previous is None:
+                return False
+            del self.alerts[name]
+            return True
+        self.alerts[name] = alert
+        return previous is None or previous["metric"] != alert["metric"]
+
+    def get_alerts(self) -> list[dict]:
+        return list(self.alerts.values())
+
+    def clear(self):
+        self.patterns.clear()
+        self.alerts.clear()
+
+class NoiseFloor:
+    """
+    Reservoir sample of frames that detected nothing plus quantile sketches of their
+    power and top pattern label probability. Fixed memory, one random draw per frame.
+    """
+    def __init__(self, size: int = NOISE_FLOOR_SAMPLE_SIZE):
+        self.size = size
+        self.samples: list[tuple[float, float, float]] = []
+        self.seen = 0
+        self.power = QuantileSketch.for_metric("power")
+        self.probability = QuantileSketch.for_metric("probability")
+
+    def add(self, ts: float, power: float, probability: float):
+        self.power.add(power)
+        self.probability.add(probability)
+        self.seen += 1
+        if len(self.samples) < self.size:
+            self.samples.append((ts, power, probability))
+        else:
+            index = random.randrange(self.seen)
+            if index < self.size:
+                self.samples[index] = (ts, power, probability)
+
+    def snapshot(self) -> list[tuple[float, float, float]]:
+        """(ts, power, probability) of the sampled frames, in ts order."""
+        return sorted(self.samples)
+
+    def summary(self) -> dict:
+        return {
+            "seen": self.seen,
+            "samples": len(self.samples),
+            "power": {q: self.power.quantile(q) for q in NOISE_FLOOR_QUANTILES},
+            "probability": {q: self.probability.quantile(q) for q in NOISE_FLOOR_QUANTILES},
+        }
+
+    def clear(self):
+        self.samples = []
+        self.seen = 0
+        self.power.clear()
+        self.probability.clear()
+
+class FrameTimingMonitor:
+    """
+    Inter-frame intervals from the audio timestamps (frame.ts) and from arrival in the wrapper.
+    A gap in ts means the audio pipeline dropped frames, a gap in arrival while ts stays
+    regular means frames were delivered late, e.g. behind a slow callback.
+    """
+    def __init__(self):
+        # 0.25ms bins, the nominal hop is the median interval
+        self.hop_sketch = QuantileSketch(0, 0.1, 400)
+        self.gaps: deque[dict] = deque(maxlen=FRAME_TIMING_MAX_GAPS)
+        self.clear()
+
+    def clear(self):
+        self.hop_sketch.clear()
+        self.ts_intervals = RollingWindow(FRAME_TIMING_WINDOW)
+        self.arrival_intervals = RollingWindow(FRAME_TIMING_WINDOW)
+        self.gaps.clear()
+        self.hop = None
+        self.frames = 0
+        self.pauses = 0
+        self.dropped_gaps = 0
+        self.dropped_frames = 0
+        self.late_gaps = 0
+        self.max_interval = 0.0
+        self.resume()
+
+    def resume(self):
+        """Forget the previous frame, e.g. after the stream was paused."""
+        self.last_ts = None
+        self.last_arrival = None
+
+    def add(self, ts: float, arrival: float) -> dict | None:
+        """Returns the gap ending at this frame, if any."""
+        last_ts = self.last_ts
+        last_arrival = self.last_arrival
+        self.last_ts = ts
+        self.last_arrival = arrival
+        self.frames += 1
+        if last_ts is None:
+            return None
+
+        interval = ts - last_ts
+        arrival_interval = arrival - last_arrival
+        if interval > FRAME_TIMING_PAUSE_SECONDS or interval <= 0:
+            self.pauses += 1
+            return None
+
+        self.ts_intervals.add(interval)
+        self.arrival_intervals.add(arrival_interval)
+        self.hop_sketch.add(interval)
+        if self.hop_sketch.total % FRAME_TIMING_HOP_REFRESH == 0:
+            self.hop = self.hop_sketch.quantile(0.5)
+        if interval > self.max_interval:
+            self.max_interval = interval
+        if self.hop is None:
+            return None
+
+        limit = FRAME_TIMING_GAP_FACTOR * self.hop
+        if interval > limit:
+            missed = max(1, round(interval / self.hop) - 1)
+            self.dropped_gaps += 1
+            self.dropped_frames += missed
+            kind = "dropped"
+        elif arrival_interval > limit and arrival_interval < FRAME_TIMING_PAUSE_SECONDS:
+            missed = 0
+            self.late_gaps += 1
+            kind = "late"
+        else:
+            return None
+
+        gap = {
+            "kind": kind,
+            "ts": ts,
+            "last_ts": last_ts,
+            "interval": interval,
+            "arrival_interval": arrival_interval,
+            "hop": self.hop,
+            "missed": missed,
+        }
+        self.gaps.append(gap)
+        return gap
+
+    def gaps_between(self, ts_from: float, ts_to: float) -> list[dict]:
+        return [gap for gap in list(self.gaps) if gap["ts"] > ts_from and gap["last_ts"] < ts_to]
+
+    def summary(self) -> dict:
+        ts_mean, ts_variance = mean_and_variance(len(self.ts_intervals.values), self.ts_intervals.sum, self.ts_intervals.sum_sq)
+        arrival_mean, arrival_variance = mean_and_variance(len(self.arrival_intervals.values), self.arrival_intervals.sum, self.arrival_intervals.sum_sq)
+        return {
+            "frames": self.frames,
+            "hop": self.hop,
+            "ts_mean": ts_mean,
+            "ts_jitter": sqrt(ts_variance),
+            "arrival_mean": arrival_mean,
+            "arrival_jitter": sqrt(arrival_variance),
+            "max_interval": self.max_interval,
+            "dropped_gaps": self.dropped_gaps,
+            "dropped_frames": self.dropped_frames,
+            "late_gaps": self.late_gaps,
+            "pauses": self.pauses,
+            "gaps": list(self.gaps),
+        }
@@ -13,6 +13,15 @@ from .parrot_integration_paths import (
 )
 
 patterns_json = {}
+patterns_version = 0
+resolved_paths = {}
+
+# Lookups derived from patterns_json, rebuilt whenever it is loaded or set
+pattern_colors = {}
+pattern_power_thresholds = {}
+pattern_grace_power_thresholds = {}
+pattern_probability_thresholds = {}
+pattern_threshold_display_cache = {}
 
 tag_ctx = Context()
 
@@ -41,12 +50,12 @@ def wait_for_registry_populated(callback, attempts=0):
         print("Parrot registry not populated after 10 attempts, continuing anyway...")
         callback()
 
-def parrot_tester_initialize(callback):
-    """Initialize Parrot Tester and wrap parrot_integration."""
-    print("**** Starting Parrot Tester ****")
-    enable_parrot_tester_tag()
-
-    try:
+def get_resolved_paths() -> dict:
+    """
+    Discover and resolve integration paths once per session.
+    Discovery walks the talon user directory, so resuming reuses the result.
+    """
+    if not resolved_paths:
         parrot_integration_path = get_parrot_integration_path().resolve()
         patterns_py_path = get_patterns_py_path().resolve()
         current_path = Path(__file__).resolve()
@@ -58,14 +67,32 @@ def parrot_tester_initialize(callback):
         current_rel = current.relative_to(user_root)
         target_rel = target.relative_to(user_root).with_suffix("")
 
-        patterns_data = load_patterns(patterns_py_path)
+        resolved_paths.update({
+            "patterns_py_path": patterns_py_path,
+            "current_path": current_path,
+            "module_path": build_module_path(current_rel, target_rel, user_root),
+        })
+    return resolved_paths
+
+def clear_resolved_paths():
+    resolved_paths.clear()
+
+def parrot_tester_initialize(callback):
+    """Initialize Parrot Tester and wrap parrot_integration."""
+    print("**** Starting Parrot Tester ****")
+    enable_parrot_tester_tag()
+
+    try:
+        paths = get_resolved_paths()
+        patterns_data = load_patterns(paths["patterns_py_path"])
         set_patterns_json(patterns_data)
 
-        temp_file_created = create_temp_parrot_file(patterns_data)
+        registry_pending = create_temp_parrot_file(patterns_data)
 
         def continue_initialization():
-            module_path = build_module_path(current_rel, target_rel, user_root)
-            generate_parrot_integration_hook(module_path, current_path)
+            # Only rewrites (and triggers a Talon reload) when the content changed,
+            # so resuming from pause re-wraps in memory.
+            generate_parrot_integration_hook(paths["module_path"], paths["current_path"])
 
             def on_ready():
                 actions.user.parrot_tester_wrap_parrot_integration()
@@ -73,7 +100,7 @@ def parrot_tester_initialize(callback):
 
             wait_for_ready(on_ready)
 
-        if temp_file_created:
+        if registry_pending:
             print("Waiting for Talon to process temporary parrot file...")
             wait_for_registry_populated(continue_initialization)
         else:
@@ -96,16 +123,58 @@ def restore_patterns_paused():
 def restore_patterns():
     actions.user.parrot_tester_restore_parrot_integration(reset_ui_state=True)
     clear_patterns_json()
+    clear_resolved_paths()
     remove_temp_parrot_file()
     disable_parrot_tester_tag()
 
+def build_pattern_lookups(data: dict):
+    """Build name -> color/threshold maps so render-time lookups are a single dict get."""
+    clear_pattern_lookups()
+    for index, (name, pattern) in enumerate(data.items()):
+        pattern_colors[name] = get_color(index)
+        pattern_power_thresholds[name] = pattern.get("threshold", {}).get(">power", None)
+        pattern_grace_power_thresholds[name] = pattern.get("grace_threshold", {}).get(">power", None)
+        probabilities = [
+            value for value in (
+                pattern.get("threshold", {}).get(">probability", None),
+                pattern.get("grace_threshold", {}).get(">probability", None),
+            ) if value is not None
+        ]
+        pattern_probability_thresholds[name] = min(probabilities) if probabilities else None
+
+def clear_pattern_lookups():
+    global patterns_version
+    patterns_version += 1
+    pattern_colors.clear()
+    pattern_power_thresholds.clear()
+    pattern_grace_power_thresholds.clear()
+    pattern_probability_thresholds.clear()
+    pattern_threshold_display_cache.clear()
+
+def get_patterns_version() -> int:
+    """Incremented every time patterns_json is loaded, set, or cleared."""
+    return patterns_version
+
 def get_pattern_color(name: str):
-    global_patterns = get_patterns_json()
-    try:
-        index = list(global_patterns.keys()).index(name)
-        return get_color(index)
-    except:
-        return "#FFFFFF"
+    if not pattern_colors:
+        get_patterns_json()
+    return pattern_colors.get(name, "#FFFFFF")
+
+def get_pattern_power_threshold(name: str):
+    if not pattern_colors:
+        get_patterns_json()
+    return pattern_power_thresholds.get(name, None)
+
+def get_pattern_grace_power_threshold(name: str):
+    if not pattern_colors:
+        get_patterns_json()
+    return pattern_grace_power_thresholds.get(name, None)
+
+def get_pattern_probability_threshold(name: str):
+    """Lowest >probability the pattern detects at, grace threshold included."""
+    if not pattern_colors:
+        get_patterns_json()
+    return pattern_probability_thresholds.get(name, None)
 
 def get_pattern_threshold_value(name: str, key: str):
     """Get a specific value from the pattern JSON."""
@@ -114,6 +183,16 @@ def get_pattern_threshold_value(name: str, key: str):
         return global_patterns[name].get("threshold", {}).get(key, None)
     return None
 
+def get_pattern_threshold_display(name: str) -> dict:
+    """Threshold values as display strings, cached per pattern until patterns reload."""
+    display = pattern_threshold_display_cache.get(name)
+    if display is None:
+        display = {}
+        for key in (">power", ">probability"):
+            value = get_pattern_threshold_value(name, key)
+            display[key] = "" if value is None else str(value)
+        pattern_threshold_display_cache[name] = display
+    return display
 
 def get_pattern_json(name: str = None):
     """Get the pattern JSON for a specific name."""
@@ -135,14 +214,17 @@ def get_patterns_json():
             patterns_json = load_patterns(patterns_py_path)
         else:
             patterns_json = {}
+        build_pattern_lookups(patterns_json)
     return patterns_json
 
 def clear_patterns_json():
     """Clear the patterns JSON cache."""
     global patterns_json
     patterns_json.clear()
+    clear_pattern_lookups()
 
 def set_patterns_json(data: dict):
     """Set the patterns JSON data."""
     global patterns_json
-    patterns_json = data
\ No newline at end of file
+    patterns_json = data
+    build_pattern_lookups(data)
\ No newline at end of file
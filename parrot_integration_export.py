@@ -0,0 +1,173 @@
+import csv
+import json
+import threading
+import time
+from pathlib import Path
+from talon import actions, cron
+from talon_init import TALON_HOME
+from .parrot_integration_wrapper import (
+    capture_collection,
+    detection_log_collection,
+    noise_floor,
+    PatternsStats,
+)
+
+EXPORT_DIR = TALON_HOME / "parrot_tester_exports"
+EXPORT_FORMATS = ["csv", "jsonl"]
+
+FRAME_FIELDS = [
+    "capture_id",
+    "log_id",
+    "frame",
+    "ts",
+    "ts_delta",
+    "power",
+    "f0",
+    "f1",
+    "f2",
+    "winner",
+    "winner_probability",
+    "winner_status",
+    "winner_margins",
+    "patterns",
+]
+
+NOISE_FLOOR_FIELDS = ["ts", "power", "top_probability"]
+
+STATS_FIELDS = ["name", "count"] + [
+    f"{metric}_{summary}"
+    for metric in ["power", "probability", "f0", "f1", "f2"]
+    for summary in ["min", "average", "max"]
+]
+
+export_status = {
+    "running": False,
+    "rows": 0,
+    "total": 0,
+    "path": None,
+    "error": None,
+}
+export_status_job = None
+
+def frame_row(frame) -> dict:
+    return {
+        "capture_id": frame.capture_id,
+        "log_id": frame.log_id,
+        "frame": frame.id,
+        "ts": frame.ts,
+        "ts_delta": frame.ts_delta,
+        "power": frame.power,
+        "f0": frame.f0,
+        "f1": frame.f1,
+        "f2": frame.f2,
+        "winner": frame.winner_name,
+        "winner_probability": frame.winner_probability,
+        "winner_status": frame.winner_status,
+        "winner_margins": ";".join(f"{key}:{margin}" for key, margin in (frame.winner.get("margins") or {}).items()),
+        "patterns": ";".join(f"{p['name']}:{p['probability']}:{p['status']}" for p in frame.patterns),
+    }
+
+def iter_capture_rows(captures: list):
+    for capture in captures:
+        for frame in capture.frames:
+            yield frame_row(frame)
+
+def iter_detection_frames(logs: list):
+    for frames in logs:
+        yield from frames
+
+def iter_detection_rows(logs: list):
+    for frame in iter_detection_frames(logs):
+        yield frame_row(frame)
+
+def iter_stats_rows(stats: dict):
+    for entry in stats.values():
+        row = {"name": entry["name"], "count": entry["count"]}
+        for metric in ["power", "probability", "f0", "f1", "f2"]:
+            for summary in ["min", "average", "max"]:
+                row[f"{metric}_{summary}"] = entry[metric][summary]
+        yield row
+
+def write_rows(path: Path, rows, fields: list[str], export_format: str):
+    """Write rows one at a time so the full dataset is never held in memory."""
+    with path.open("w", encoding="utf-8", newline="") as f:
+        if export_format == "csv":
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                export_status["rows"] += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(row))
+                f.write("\n")
+                export_status["rows"] += 1
+
+def iter_noise_floor_rows(samples: list):
+    for ts, power, probability in samples:
+        yield {"ts": ts, "power": power, "top_probability": probability}
+
+def build_stats(logs: list) -> dict:
+    """Stats over every logged frame, independent of whether the stats tab was open."""
+    patterns_stats = PatternsStats()
+    for frame in iter_detection_frames(logs):
+        patterns_stats.add_frame(frame)
+    return patterns_stats.get_stats()
+
+def run_export(export_dir: Path, export_format: str, captures: list, logs: list, noise_samples: list):
+    try:
+        stats = build_stats(logs)
+        export_status["total"] += len(stats)
+        export_dir.mkdir(parents=True, exist_ok=True)
+        write_rows(export_dir / f"captures.{export_format}", iter_capture_rows(captures), FRAME_FIELDS, export_format)
+        write_rows(export_dir / f"detections.{export_format}", iter_detection_rows(logs), FRAME_FIELDS, export_format)
+        write_rows(export_dir / f"stats.{export_format}", iter_stats_rows(stats), STATS_FIELDS, export_format)
+        write_rows(export_dir / f"noise_floor.{export_format}", iter_noise_floor_rows(noise_samples), NOISE_FLOOR_FIELDS, export_format)
+        print(f"Parrot Tester: exported {export_status['rows']} rows to {export_dir}")
+    except Exception as e:
+        export_status["error"] = str(e)
+        print(f"❌ Parrot Tester export failed: {e}")
+    finally:
+        export_status["running"] = False
+
+def push_export_status():
+    """Runs on the main thread, since UI state shouldn't be set from the export thread."""
+    global export_status_job
+    actions.user.ui_elements_set_state("export_status", dict(export_status))
+    if not export_status["running"] and export_status_job is not None:
+        cron.cancel(export_status_job)
+        export_status_job = None
+
+def export_session(export_format: str = "csv"):
+    """Export captures, detection logs and stats on a background thread."""
+    global export_status_job
+    if export_status["running"]:
+        return
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    # Snapshots, so the export thread never sees the collections grow
+    captures = capture_collection.snapshot()
+    logs = detection_log_collection.snapshot()
+    # Fixed size, a copy is cheap
+    noise_samples = noise_floor.snapshot()
+    total = sum(len(c.frames) for c in captures) + sum(len(frames) for frames in logs) + len(noise_samples)
+    export_dir = EXPORT_DIR / time.strftime("%Y-%m-%d_%H-%M-%S")
+
+    export_status.update({
+        "running": True,
+        "rows": 0,
+        "total": total,
+        "path": str(export_dir),
+        "error": None,
+    })
+
+    threading.Thread(
+        target=run_export,
+        args=(export_dir, export_format, captures, logs, noise_samples),
+        daemon=True,
+    ).start()
+
+    if export_status_job is None:
+        export_status_job = cron.interval("200ms", push_export_status)
+    push_export_status()
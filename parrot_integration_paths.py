@@ -3,13 +3,34 @@ import os
 import sys
 import json
 import re
-from talon_init import TALON_HOME
+import hashlib
+from talon_init import TALON_HOME, TALON_USER
 from talon import registry
 
 DEBUG_PATH_DISCOVERY = False
 
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """
+    Write content to path only if it differs from what is already there.
+    Every write of a .py or .talon file makes Talon reload it, so skipping
+    identical writes avoids a reload on every Pause -> Start.
+    """
+    try:
+        if path.exists() and content_hash(path.read_text(encoding="utf-8")) == content_hash(content):
+            return False
+    except Exception:
+        pass
+    path.write_text(content, encoding="utf-8")
+    return True
+
 def create_temp_parrot_file(patterns_data: dict):
-    """Needed if registry.parrot_noises is empty."""
+    """
+    Needed if registry.parrot_noises is empty. Returns True while the registry
+    isn't populated yet, even if the temp file was already written earlier.
+    """
     parrot_noises = getattr(registry, "parrot_noises", {})
 
     if not parrot_noises:
@@ -18,9 +39,8 @@ def create_temp_parrot_file(patterns_data: dict):
         current_dir = Path(__file__).parent
         temp_file_path = current_dir / "parrot_integration_temp.talon"
         temp_content = f"# AUTO-GENERATED: Temporary file to populate parrot registry\ntag: user.parrot_tester\n-\nparrot({first_pattern}): skip()\n"
-        temp_file_path.write_text(temp_content)
-        print(f"Created temporary parrot file: {temp_file_path}")
-
+        if write_if_changed(temp_file_path, temp_content):
+            print(f"Created temporary parrot file: {temp_file_path}")
         return True
 
     return False
@@ -209,16 +229,30 @@ def build_module_path(current_file: Path, target_file: Path, user_root: Path) ->
 
     return full_path
 
+def get_module_name_guesses(module_path: Path) -> list[str]:
+    """
+    Likely sys.modules names for a file in the talon user directory,
+    e.g. user/parrot/parrot_integration.py -> "user.parrot.parrot_integration".
+    """
+    try:
+        relative = module_path.resolve().relative_to(Path(TALON_USER).resolve()).with_suffix("")
+    except ValueError:
+        return []
+    dotted = ".".join(relative.parts)
+    return [f"user.{dotted}", dotted]
+
 def generate_parrot_integration_hook(module_path: Path, current_file: Path) -> bool:
     """
     Generate the parrot_integration_hook.py file using importlib for module loading.
     This allows importing from paths with dashes or other special characters.
+    Returns True if the file was written, False if it was already up to date.
     """
     target_dir = current_file.parent
     hook_file = target_dir / "parrot_integration_hook.py"
 
     # Escape backslashes for Windows paths in the generated Python code
     module_path_str = str(module_path).replace("\\", "\\\\")
+    module_name_guesses = get_module_name_guesses(module_path)
 
     code = f"""\
 # AUTO-GENERATED: Do not edit manually.
@@ -228,29 +262,63 @@ try:
     from talon import Context
     import importlib.util
     import sys
+    import weakref
     from pathlib import Path
     from .parrot_integration_wrapper import (
         parrot_tester_wrap_parrot_integration,
         parrot_tester_restore_parrot_integration
     )
 
+    _module_path = Path(r"{module_path_str}")
+    _module_name_guesses = {module_name_guesses!r}
+    _cached = {{"name": None, "module_ref": None, "fresh_module": None}}
+
+    def _is_target_module(module):
+        try:
+            module_file = getattr(module, '__file__', None)
+            if not module_file or not hasattr(module, 'parrot_delegate'):
+                return False
+            return Path(module_file).resolve() == _module_path
+        except Exception:
+            return False
+
+    def _cache_module(module_name, module):
+        _cached["name"] = module_name
+        _cached["module_ref"] = weakref.ref(module)
+        # The module Talon loaded replaces any copy we loaded ourselves
+        _cached["fresh_module"] = None
+        return module.parrot_delegate
+
+    def _get_cached_delegate():
+        # Still valid as long as Talon hasn't reloaded the module under the same name
+        if _cached["module_ref"] is not None:
+            module = _cached["module_ref"]()
+            if module is not None and sys.modules.get(_cached["name"]) is module:
+                return getattr(module, 'parrot_delegate', None)
+            _cached["name"] = None
+            _cached["module_ref"] = None
+        return None
+
     def get_parrot_delegate():
-        # Find the parrot_integration module that Talon already loaded
-        # by searching sys.modules for the one loaded from this specific path
-        _module_path = Path(r"{module_path_str}")
+        parrot_delegate = _get_cached_delegate()
+        if parrot_delegate is not None:
+            return parrot_delegate
+
+        # Find the parrot_integration module that Talon already loaded,
+        # trying the expected module names before scanning all of sys.modules
+        for module_name in _module_name_guesses:
+            module = sys.modules.get(module_name)
+            if module is not None and _is_target_module(module):
+                return _cache_module(module_name, module)
 
         for module_name, module in list(sys.modules.items()):
-            if module is None:
-                continue
-            try:
-                if hasattr(module, '__file__') and module.__file__:
-                    module_file = Path(module.__file__).resolve()
-                    if module_file == _module_path and hasattr(module, 'parrot_delegate'):
-                        return module.parrot_delegate
-            except Exception:
-                pass
-
-        # If not found in sys.modules, load it fresh (first run scenario)
+            if module is not None and _is_target_module(module):
+                return _cache_module(module_name, module)
+
+        # Only when Talon hasn't loaded it, reuse or load our own copy (first run scenario)
+        if _cached["fresh_module"] is not None:
+            return _cached["fresh_module"].parrot_delegate
+
         _spec = importlib.util.spec_from_file_location("parrot_integration_for_tester", _module_path)
         if _spec is None:
             raise ImportError(f"Cannot load module spec from {{_module_path}}")
@@ -261,6 +329,7 @@ try:
         if not hasattr(_module, 'parrot_delegate'):
             raise AttributeError(f"Module {{_module_path}} has no 'parrot_delegate' attribute")
 
+        _cached["fresh_module"] = _module
         return _module.parrot_delegate
 
     ctx = Context()
@@ -283,5 +352,8 @@ except Exception as e:
     traceback.print_exc()
 """
 
-    hook_file.write_text(code)
+    if not write_if_changed(hook_file, code):
+        return False
+
     print(f"Generated file: {hook_file}")
+    return True
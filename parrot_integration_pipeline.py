@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+
+QUEUE_SIZE = 4096
+# Kept records (detections) may go past QUEUE_SIZE, but not past this
+KEEP_QUEUE_SIZE = 2 * QUEUE_SIZE
+IDLE_WAIT = 0.01
+
+class Call:
+    """Queued in order with the records, runs fn on the worker instead of process."""
+    __slots__ = ("fn",)
+
+    def __init__(self, fn):
+        self.fn = fn
+
+class AnalyticsPipeline:
+    """
+    Bounded single producer, single consumer queue in front of a worker thread.
+    The audio thread only appends a record, everything else runs on the worker.
+    deque append/popleft are atomic, so neither end takes a lock.
+    """
+    def __init__(self, size: int = QUEUE_SIZE, keep_size: int = KEEP_QUEUE_SIZE):
+        self.size = size
+        self.keep_size = keep_size
+        self.queue: deque[tuple[float, object]] = deque()
+        self.wake = threading.Event()
+        self.thread = None
+        # running stays True until the worker has exited, stopping asks it to.
+        # lock only guards that exit against a start() reusing the worker
+        self.lock = threading.Lock()
+        self.running = False
+        self.stopping = False
+        self.process = None
+        self.on_idle = None
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        self.dropped = 0
+        self.dropped_kept = 0
+        self.processed = 0
+        self.max_depth = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self, process, on_idle=None):
+        """Start the worker, or keep the one that is still draining after stop()."""
+        with self.lock:
+            self.process = process
+            self.on_idle = on_idle
+            self.stopping = False
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self, then=None):
+        """
+        Ask the worker to exit once it has processed everything already queued, without waiting.
+        then runs on the worker after those records, running turns False when it has exited.
+        """
+        if not self.running:
+            return
+        if then is not None:
+            self.queue.append((time.perf_counter(), Call(then)))
+        self.stopping = True
+        self.wake.set()
+
+    def submit(self, record, keep: bool = False) -> bool:
+        """Drops the record when the queue is full, kept records (detections) only when it's past keep_size."""
+        depth = len(self.queue)
+        if depth >= self.size:
+            if not keep:
+                self.dropped += 1
+                return False
+            if depth >= self.keep_size:
+                self.dropped += 1
+                self.dropped_kept += 1
+                return False
+        self.queue.append((time.perf_counter(), record))
+        if depth >= self.max_depth:
+            self.max_depth = depth + 1
+        if not self.wake.is_set():
+            self.wake.set()
+        return True
+
+    def _run(self):
+        while True:
+            while self.queue:
+                enqueued_at, record = self.queue.popleft()
+                if type(record) is Call:
+                    try:
+                        record.fn()
+                    except Exception as e:
+                        print(f"❌ Parrot Tester analytics error: {e}")
+                    continue
+                try:
+                    self.process(record)
+                except Exception as e:
+                    print(f"❌ Parrot Tester analytics error: {e}")
+                self.lag = time.perf_counter() - enqueued_at
+                if self.lag > self.max_lag:
+                    self.max_lag = self.lag
+                self.processed += 1
+
+            if self.stopping:
+                with self.lock:
+                    if self.stopping and not self.queue:
+                        self.stopping = False
+                        self.running = False
+                        self.thread = None
+                        return
+            self.wake.wait(IDLE_WAIT)
+            self.wake.clear()
+            if self.on_idle is not None and not self.queue:
+                try:
+                    self.on_idle()
+                except Exception as e:
+                    print(f"❌ Parrot Tester analytics error: {e}")
+
+    def metrics(self) -> dict:
+        return {
+            "running": self.running,
+            "depth": len(self.queue),
+            "max_depth": self.max_depth,
+            "dropped": self.dropped,
+            "dropped_kept": self.dropped_kept,
+            "processed": self.processed,
+            "lag_ms": self.lag * 1000,
+            "max_lag_ms": self.max_lag * 1000,
+        }
@@ -0,0 +1,186 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from talon import cron
+from talon_init import TALON_HOME
+from . import parrot_integration_wrapper as wrapper
+
+PROFILE_DIR = TALON_HOME / "parrot_tester_profiles"
+PROFILE_TOP = 30
+MEMORY_TOP = 25
+PACKAGE_DIR = str(Path(__file__).parent)
+# From 3.12 cProfile runs on sys.monitoring, which is interpreter wide: one profiler
+# sees every thread and a second one can't be enabled while it's active
+PROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+class ThreadProfiles:
+    """Before 3.12 cProfile only sees the thread it was enabled on, so each thread gets its own profiler."""
+    def __init__(self):
+        self.local = threading.local()
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self.lock = threading.Lock()
+
+    def get(self) -> cProfile.Profile:
+        profile = getattr(self.local, "profile", None)
+        if profile is None:
+            profile = self.local.profile = cProfile.Profile()
+            with self.lock:
+                self.profiles[threading.current_thread().name] = profile
+        return profile
+
+    def wrap(self, fn):
+        """A profiler failure falls back to calling fn unprofiled, it must never reach pattern_match."""
+        def profiled(*args, **kwargs):
+            profile = self.get()
+            try:
+                profile.enable()
+            except Exception:
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                try:
+                    profile.disable()
+                except Exception:
+                    pass
+        return profiled
+
+profile_session = None
+
+def collection_sizes() -> dict:
+    return {
+        "captures": len(wrapper.capture_collection.captures),
+        "capture frames": sum(len(capture.frames) for capture in wrapper.capture_collection.snapshot()),
+        "detection log pages": len(wrapper.detection_log_collection.collection),
+        "detection log frames": len(wrapper.detection_log_collection.frames),
+        "stats patterns": len(wrapper.patterns_stats.stats) if wrapper.patterns_stats else 0,
+        "timeline frames": wrapper.frame_history.count,
+        "noise floor samples": len(wrapper.noise_floor.samples),
+    }
+
+def format_stats(title: str, profile: cProfile.Profile, sort: str) -> str:
+    out = io.StringIO()
+    try:
+        stats = pstats.Stats(profile, stream=out)
+    except TypeError:
+        # Nothing was recorded on this thread
+        return f"== {title}: no calls recorded\n"
+    stats.strip_dirs().sort_stats(sort).print_stats(PROFILE_TOP)
+    return f"== {title}, by {sort}\n{out.getvalue()}"
+
+def format_memory(snapshot: tracemalloc.Snapshot) -> str:
+    """Allocation sites still alive at the end of the window, in this package only."""
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(True, f"{PACKAGE_DIR}*")])
+    lines = ["== Allocation sites"]
+    for stat in snapshot.statistics("lineno")[:MEMORY_TOP]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {Path(frame.filename).name}:{frame.lineno}")
+    return "\n".join(lines) + "\n"
+
+class ProfileSession:
+    def __init__(self, seconds: int, memory: bool):
+        self.seconds = seconds
+        self.memory = memory
+        self.started_at = time.time()
+        self.main_profile = cProfile.Profile()
+        self.thread_profiles = ThreadProfiles()
+        self.restore = []
+        self.sizes_before = collection_sizes()
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        else:
+            self.memory = self.memory and tracemalloc.is_tracing()
+
+        # The pattern_match wrapper runs on the audio thread and the analytics pipeline
+        # on its own thread, render and UI dispatch run on the main thread
+        if PROFILE_PER_THREAD:
+            delegate = wrapper.wrapped_delegate
+            if delegate is not None:
+                self.swap(delegate, "pattern_match")
+            if wrapper.analytics.running:
+                self.swap(wrapper.analytics, "process")
+
+        # The action may run off the main thread, cProfile only profiles the thread that
+        # enables it, so enabling and disabling both happen in cron callbacks
+        cron.after("0ms", self.start_main_profile)
+
+    def start_main_profile(self):
+        try:
+            self.main_profile.enable()
+        except Exception as e:
+            print(f"❌ Parrot Tester profile: main thread not profiled, {e}")
+        cron.after(f"{self.seconds}s", self.finish)
+
+    def swap(self, owner, name: str):
+        """Replace owner.name with a profiled version, put back at the end unless it was replaced meanwhile."""
+        original = getattr(owner, name)
+        profiled = self.thread_profiles.wrap(original)
+        setattr(owner, name, profiled)
+
+        def restore():
+            if getattr(owner, name) is profiled:
+                setattr(owner, name, original)
+        self.restore.append(restore)
+
+    def finish(self):
+        global profile_session
+        try:
+            self.main_profile.disable()
+        except Exception:
+            pass
+        for restore in self.restore:
+            restore()
+        snapshot = None
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+        try:
+            path = self.write_report(snapshot)
+            print(f"Parrot Tester: profile written to {path}")
+        except Exception as e:
+            print(f"❌ Parrot Tester profile failed: {e}")
+        profile_session = None
+
+    def write_report(self, snapshot) -> Path:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"profile_{time.strftime('%Y-%m-%d_%H-%M-%S', time.localtime(self.started_at))}.txt"
+        sizes_after = collection_sizes()
+
+        sections = [
+            f"Parrot Tester profile, {self.seconds}s from {time.ctime(self.started_at)}\n",
+            f"Recording level: {wrapper.active_level} (selected {wrapper.recording_level})\n",
+            "== Collections (before -> after)\n" + "".join(
+                f"{name:>22}: {self.sizes_before[name]} -> {sizes_after[name]}\n" for name in sizes_after
+            ),
+        ]
+        if PROFILE_PER_THREAD:
+            sections.append(format_stats("Main thread (UI render, dispatch)", self.main_profile, "cumulative"))
+        else:
+            sections.append(format_stats("All threads", self.main_profile, "cumulative"))
+            sections.append(format_stats("All threads", self.main_profile, "tottime"))
+        for name, profile in self.thread_profiles.profiles.items():
+            sections.append(format_stats(f"Thread {name}", profile, "cumulative"))
+            sections.append(format_stats(f"Thread {name}", profile, "tottime"))
+        if snapshot is not None:
+            sections.append(format_memory(snapshot))
+
+        path.write_text("\n".join(sections), encoding="utf-8")
+        return path
+
+def start_profile(seconds: int = 10, memory: bool = False):
+    """Profile the wrapper, analytics and UI for `seconds`, then write a report file."""
+    global profile_session
+    if profile_session is not None:
+        print("Parrot Tester: a profile is already running")
+        return
+    profile_session = ProfileSession(seconds, memory)
+    profile_session.start()
+    print(f"Parrot Tester: profiling for {seconds}s{' with memory' if memory else ''}")
@@ -0,0 +1,404 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from talon_init import TALON_HOME
+
+STORE_PATH = TALON_HOME / "parrot_tester_sessions.db"
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+QUEUE_SIZE = 20000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    patterns_json TEXT,
+    stats_json TEXT,
+    -- Last flush, so a session cut off before it ended still has a length
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    capture_key TEXT,
+    wall_time REAL NOT NULL,
+    ts REAL,
+    frame_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS capture_patterns (
+    capture_id INTEGER NOT NULL,
+    pattern TEXT NOT NULL,
+    detected INTEGER NOT NULL,
+    PRIMARY KEY (pattern, capture_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS frames (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    capture_id INTEGER,
+    wall_time REAL NOT NULL,
+    ts REAL,
+    power REAL,
+    f0 REAL,
+    f1 REAL,
+    f2 REAL,
+    winner TEXT,
+    winner_probability REAL,
+    winner_status TEXT
+);
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    wall_time REAL NOT NULL,
+    ts REAL,
+    pattern TEXT NOT NULL,
+    status TEXT,
+    power REAL,
+    probability REAL,
+    f0 REAL,
+    f1 REAL,
+    f2 REAL
+);
+CREATE TABLE IF NOT EXISTS pattern_aggregates (
+    session_id INTEGER NOT NULL,
+    pattern TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    power_sum REAL NOT NULL,
+    power_min REAL,
+    power_max REAL,
+    probability_sum REAL NOT NULL,
+    probability_min REAL,
+    probability_max REAL,
+    PRIMARY KEY (session_id, pattern)
+);
+CREATE INDEX IF NOT EXISTS idx_captures_session ON captures (session_id, wall_time);
+CREATE INDEX IF NOT EXISTS idx_frames_capture ON frames (capture_id);
+CREATE INDEX IF NOT EXISTS idx_frames_session ON frames (session_id, wall_time);
+CREATE INDEX IF NOT EXISTS idx_detections_pattern_time ON detections (pattern, wall_time);
+CREATE INDEX IF NOT EXISTS idx_detections_pattern_power ON detections (pattern, power);
+CREATE INDEX IF NOT EXISTS idx_detections_session ON detections (session_id, pattern);
+"""
+
+AGGREGATE_UPSERT = """
+INSERT INTO pattern_aggregates (
+    session_id, pattern, count, power_sum, power_min, power_max,
+    probability_sum, probability_min, probability_max
+) VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id, pattern) DO UPDATE SET
+    count = count + 1,
+    power_sum = power_sum + excluded.power_sum,
+    power_min = MIN(power_min, excluded.power_min),
+    power_max = MAX(power_max, excluded.power_max),
+    probability_sum = probability_sum + excluded.probability_sum,
+    probability_min = MIN(probability_min, excluded.probability_min),
+    probability_max = MAX(probability_max, excluded.probability_max)
+"""
+
+def connect(path=STORE_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+    if "stats_json" not in columns:
+        conn.execute("ALTER TABLE sessions ADD COLUMN stats_json TEXT")
+    if "updated_at" not in columns:
+        conn.execute("ALTER TABLE sessions ADD COLUMN updated_at REAL")
+    return conn
+
+class SessionWriter:
+    """
+    Queue, stats and writer thread of a single session. Each session gets its own,
+    so a session that is ending never consumes items or stats of the next one.
+    """
+    def __init__(self, path, session_id: int, stats):
+        self.path = path
+        self.session_id = session_id
+        self.queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        # PatternsStats for this session, updated by the writer thread
+        self.stats = stats
+        self.stats_lock = threading.Lock()
+        self.started_at = time.time()
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, args=(session_id, self.queue, stats), daemon=True)
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def end(self, ended_at: float):
+        """Blocks until the end marker is queued, dropping it would leave the writer running forever."""
+        self.queue.put(("end", ended_at, None))
+
+    def _run(self, session_id: int, items: queue.Queue, stats):
+        conn = connect(self.path)
+        batch = []
+        try:
+            while True:
+                try:
+                    item = items.get(timeout=FLUSH_INTERVAL)
+                except queue.Empty:
+                    item = None
+
+                if item is not None and item[0] != "end":
+                    batch.append(item)
+
+                if batch and (item is None or item[0] == "end" or len(batch) >= BATCH_SIZE):
+                    self._write_batch(conn, session_id, stats, batch)
+                    batch = []
+
+                if item is not None and item[0] == "end":
+                    # The summary comes from this writer's stats, bound to session_id
+                    with self.stats_lock:
+                        stats_json = json.dumps(stats.snapshot())
+                    conn.execute(
+                        "UPDATE sessions SET ended_at = ?, stats_json = ? WHERE id = ?",
+                        (item[1], stats_json, session_id),
+                    )
+                    conn.commit()
+                    return
+        except Exception as e:
+            print(f"❌ Parrot Tester session store error: {e}")
+        finally:
+            conn.close()
+
+    def stats_snapshot(self) -> dict:
+        with self.stats_lock:
+            return self.stats.snapshot()
+
+    def _write_batch(self, conn: sqlite3.Connection, session_id: int, stats, batch: list):
+        detections = []
+        aggregates = []
+        with conn:
+            for kind, wall_time, item in batch:
+                if kind == "detection":
+                    with self.stats_lock:
+                        stats.add_frame(item)
+                    for p in item.patterns:
+                        if p["status"] not in ("detected", "grace_detected"):
+                            continue
+                        detections.append((
+                            session_id, wall_time, item.ts, p["name"], p["status"],
+                            item.power, p["probability"], item.f0, item.f1, item.f2,
+                        ))
+                        aggregates.append((
+                            session_id, p["name"], item.power, item.power, item.power,
+                            p["probability"], p["probability"], p["probability"],
+                        ))
+                elif kind == "capture":
+                    self._write_capture(conn, session_id, wall_time, item)
+
+            conn.executemany(
+                "INSERT INTO detections (session_id, wall_time, ts, pattern, status, power, probability, f0, f1, f2) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                detections,
+            )
+            conn.executemany(AGGREGATE_UPSERT, aggregates)
+            # Kept current on every flush, a session cut off by a quit or reload never reaches "end"
+            with self.stats_lock:
+                stats_json = json.dumps(stats.snapshot())
+            conn.execute(
+                "UPDATE sessions SET updated_at = ?, stats_json = ? WHERE id = ?",
+                (time.time(), stats_json, session_id),
+            )
+
+    def _write_capture(self, conn: sqlite3.Connection, session_id: int, wall_time: float, capture):
+        frames = capture.frames
+        cursor = conn.execute(
+            "INSERT INTO captures (session_id, capture_key, wall_time, ts, frame_count) VALUES (?, ?, ?, ?, ?)",
+            (session_id, capture.id, wall_time, frames[0].ts if frames else None, len(frames)),
+        )
+        capture_id = cursor.lastrowid
+        detected = set(capture.detected_pattern_names)
+        conn.executemany(
+            "INSERT OR IGNORE INTO capture_patterns (capture_id, pattern, detected) VALUES (?, ?, ?)",
+            [(capture_id, name, int(name in detected)) for name in capture.pattern_names],
+        )
+        last_ts = frames[-1].ts if frames else 0
+        conn.executemany(
+            "INSERT INTO frames (session_id, capture_id, wall_time, ts, power, f0, f1, f2, winner, winner_probability, winner_status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(
+                session_id, capture_id, wall_time - (last_ts - frame.ts), frame.ts,
+                frame.power, frame.f0, frame.f1, frame.f2,
+                frame.winner_name, frame.winner_probability, frame.winner_status,
+            ) for frame in frames],
+        )
+
+class SessionStore:
+    """
+    Persists detections and captures to SQLite from a background writer thread.
+    The audio thread only does a non-blocking queue put; rows are inserted in batches.
+    """
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.writer: SessionWriter | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.writer is not None
+
+    def start_session(self, patterns_json: dict):
+        if self.active:
+            return
+        conn = connect(self.path)
+        try:
+            cursor = conn.execute(
+                "INSERT INTO sessions (started_at, patterns_json) VALUES (?, ?)",
+                (time.time(), json.dumps(patterns_json)),
+            )
+            conn.commit()
+            session_id = cursor.lastrowid
+        finally:
+            conn.close()
+        # Imported here, the wrapper imports this module
+        from .parrot_integration_wrapper import PatternsStats
+        writer = SessionWriter(self.path, session_id, PatternsStats())
+        writer.thread.start()
+        self.writer = writer
+
+    def end_session(self):
+        writer = self.writer
+        if writer is None:
+            return
+        self.writer = None
+        writer.end(time.time())
+
+    def add_detection(self, frame):
+        writer = self.writer
+        if writer is not None:
+            writer.put(("detection", time.time(), frame))
+
+    def add_capture(self, capture):
+        writer = self.writer
+        if writer is not None:
+            writer.put(("capture", time.time(), capture))
+
+    def live_snapshot(self) -> dict | None:
+        """Snapshot of the running session in the same shape as load_session_snapshot."""
+        # One reference, so id and stats always belong to the same session
+        writer = self.writer
+        if writer is None:
+            return None
+        return {
+            "id": writer.session_id,
+            "started_at": writer.started_at,
+            "duration": time.time() - writer.started_at,
+            "stats": writer.stats_snapshot(),
+        }
+
+session_store = SessionStore()
+
+def query_sessions(limit: int = 50) -> list[dict]:
+    """Most recent sessions with a stats snapshot, newest first."""
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            "SELECT id, started_at, COALESCE(ended_at, updated_at) AS ended_at, ended_at IS NULL AS cut_off "
+            "FROM sessions WHERE stats_json IS NOT NULL ORDER BY started_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+def load_session_snapshot(session_id: int) -> dict | None:
+    conn = connect()
+    try:
+        row = conn.execute(
+            "SELECT started_at, COALESCE(ended_at, updated_at), stats_json FROM sessions WHERE id = ?",
+            (session_id,),
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row or not row[2]:
+        return None
+    started_at, ended_at, stats_json = row
+    return {
+        "id": session_id,
+        "started_at": started_at,
+        "duration": (ended_at or started_at) - started_at,
+        "stats": json.loads(stats_json),
+    }
+
+def query_detections(
+    pattern: str,
+    min_power: float = None,
+    max_power: float = None,
+    since: float = None,
+    limit: int = 1000,
+) -> list[dict]:
+    """
+    e.g. all pop detections with power below 12 in the last week:
+    query_detections("pop", max_power=12, since=time.time() - 7 * 86400)
+    """
+    clauses = ["pattern = ?"]
+    params = [pattern]
+    if min_power is not None:
+        clauses.append("power > ?")
+        params.append(min_power)
+    if max_power is not None:
+        clauses.append("power < ?")
+        params.append(max_power)
+    if since is not None:
+        clauses.append("wall_time >= ?")
+        params.append(since)
+    params.append(limit)
+
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            f"SELECT * FROM detections WHERE {' AND '.join(clauses)} ORDER BY wall_time DESC LIMIT ?",
+            params,
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+def query_captures_with_patterns(patterns: list[str], since: float = None, limit: int = 1000) -> list[dict]:
+    """Captures where all given patterns occurred, e.g. ["hiss", "shush"]."""
+    params = list(patterns)
+    since_clause = ""
+    if since is not None:
+        since_clause = "AND c.wall_time >= ?"
+        params.append(since)
+    params.append(len(patterns))
+    params.append(limit)
+
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT c.* FROM captures c
+            JOIN capture_patterns cp ON cp.capture_id = c.id
+            WHERE cp.pattern IN ({','.join('?' * len(patterns))}) {since_clause}
+            GROUP BY c.id
+            HAVING COUNT(DISTINCT cp.pattern) = ?
+            ORDER BY c.wall_time DESC
+            LIMIT ?
+            """,
+            params,
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+def query_pattern_aggregates(session_id: int) -> dict:
+    conn = connect()
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            "SELECT * FROM pattern_aggregates WHERE session_id = ?",
+            (session_id,),
+        ).fetchall()
+        return {row["pattern"]: dict(row) for row in rows}
+    finally:
+        conn.close()
@@ -1,13 +1,25 @@
-from talon import actions, cron
+from talon import actions, cron, settings
 from talon.experimental.parrot import ParrotFrame
+from collections import deque
 from math import floor
+from types import SimpleNamespace
+import random
+import threading
+import time
+from bisect import bisect_left, bisect_right
 from .ui.colors import get_color
 from .parrot_integration_controller import (
     get_patterns_json,
+    get_pattern_power_threshold,
+    get_pattern_grace_power_threshold,
+    get_pattern_probability_threshold,
 )
 from .parrot_integration_controller import (
     restore_patterns_paused,
 )
+from .parrot_integration_store import session_store
+from .parrot_integration_pipeline import AnalyticsPipeline
+from .parrot_integration_analysis import METRICS, DriftDetector, FrameTimingMonitor, NoiseFloor, QuantileSketch, RollingWindow, Rollup
 
 def truncate_stringify(x: float, decimals: int = 3) -> str:
     factor = 10 ** decimals
@@ -45,8 +57,9 @@ class ParrotTesterFrame:
         self.grace_detected = False
         self.log_id = None
         self.capture_id = None
+        self._display = None
 
-    def add_pattern(self, name: str, sounds: set[str], probability: float, detected: bool, throttled: bool, graceperiod: bool, color: str, grace_detected=bool):
+    def add_pattern(self, name: str, sounds: set[str], probability: float, detected: bool, throttled: bool, graceperiod: bool, color: str, grace_detected=bool, margins: dict = None):
         if probability > self.THRESHOLD_PROBABILITY:
             if detected:
                 self.detected = True
@@ -60,6 +73,7 @@ class ParrotTesterFrame:
                 "status": "grace_detected" if grace_detected else "detected" if detected else "throttled" if throttled else "",
                 "graceperiod": graceperiod,
                 "color": color,
+                "margins": margins,
             })
 
     def freeze(self):
@@ -76,6 +90,25 @@ class ParrotTesterFrame:
             return ""
         return truncate_stringify(value, decimals)
 
+    @property
+    def display(self) -> dict:
+        """Formatted strings for rendering, computed once on first render."""
+        if self._display is None:
+            winner_probability = self.winner.get("probability")
+            self._display = {
+                "id": str(self.id),
+                "ts": self.format(self.ts, 3),
+                "ts_delta": self.format(self.ts_delta, 3),
+                "power": self.format(self.power, 2),
+                "winner_probability": self.format(winner_probability, 4),
+                "winner_probability_short": self.format(winner_probability, 3),
+                "probabilities": [self.format(p["probability"], 4) for p in self.patterns],
+                "f0": str(round(self.f0)),
+                "f1": str(round(self.f1)),
+                "f2": str(round(self.f2)),
+            }
+        return self._display
+
     @property
     def winner(self):
         return self.patterns[0] if self.patterns else {}
@@ -86,15 +119,11 @@ class ParrotTesterFrame:
 
     @property
     def winner_power_threshold(self):
-        name = self.winner_name
-        global_patterns = get_patterns_json()
-        return global_patterns.get(name, {}).get("threshold", {}).get(">power", None)
+        return get_pattern_power_threshold(self.winner_name)
 
     @property
     def winner_grace_power_threshold(self):
-        name = self.winner_name
-        global_patterns = get_patterns_json()
-        return global_patterns.get(name, {}).get("grace_threshold", {}).get(">power", None)
+        return get_pattern_grace_power_threshold(self.winner_name)
 
     @property
     def winner_probability(self):
@@ -131,6 +160,154 @@ class Buffer:
 
 buffer = Buffer()
 
+class FrameHistory:
+    """Fixed-size ring buffer of (ts, power, patterns) for every frame, used by the timeline."""
+    def __init__(self, size: int = 6000):
+        self.size = size
+        self.entries: list[tuple | None] = [None] * size
+        self.index = 0
+        self.count = 0
+
+    def add(self, ts: float, power: float, patterns: list[dict]):
+        self.entries[self.index] = (ts, power, patterns)
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def last_ts(self) -> float | None:
+        if not self.count:
+            return None
+        return self.entries[(self.index - 1) % self.size][0]
+
+    def since(self, ts_from: float) -> list[tuple]:
+        """
+        Entries newer than ts_from in chronological order. Bisects on ts, so the
+        cost depends on the window rather than the history size.
+        """
+        # clear() replaces the list, so a reference taken here never gains None entries
+        entries, index, count = self.entries, self.index, self.count
+        start = (index - count) % self.size
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            entry = entries[(start + middle) % self.size]
+            if entry is None or entry[0] < ts_from:
+                low = middle + 1
+            else:
+                high = middle
+        window = [entries[(start + i) % self.size] for i in range(low, count)]
+        return [entry for entry in window if entry is not None]
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.index = 0
+        self.count = 0
+
+frame_history = FrameHistory()
+
+# A day of per-minute buckets and a week of 10 minute buckets
+minute_rollup = Rollup(60, 24 * 60)
+ten_minute_rollup = Rollup(600, 7 * 24 * 6)
+
+def add_frame_to_rollups(frame: ParrotTesterFrame):
+    for p in frame.patterns:
+        if p["status"]:
+            minute_rollup.add(frame.ts, p["name"], p["status"], frame.power, p["probability"])
+            ten_minute_rollup.add(frame.ts, p["name"], p["status"], frame.power, p["probability"])
+
+drift_detector = DriftDetector()
+noise_floor = NoiseFloor()
+
+def add_frame_to_noise_floor(frame: ParrotFrame, labels: tuple[str, ...]):
+    """The probability is the top one among pattern labels, quiet frames are mostly the silence class."""
+    classes = frame.classes
+    noise_floor.add(frame.ts, frame.power, max((classes.get(label, 0.0) for label in labels), default=0.0))
+
+def update_noise_floor_state():
+    actions.user.ui_elements_set_state("noise_floor", noise_floor.summary())
+
+frame_timing = FrameTimingMonitor()
+# Cost of the previous pattern_match call, and spans of recent main thread work
+last_frame_cost = 0.0
+ui_work: deque[tuple[str, float, float]] = deque(maxlen=32)
+ui_busy = None
+
+def run_ui_work(name: str, fn):
+    """Run main thread work, keeping its span so frame gaps can be related to it."""
+    global ui_busy
+    start = time.perf_counter()
+    ui_busy = (name, start)
+    try:
+        fn()
+    finally:
+        ui_busy = None
+        ui_work.append((name, start, time.perf_counter()))
+
+def ui_work_during(start: float, end: float) -> list[str]:
+    names = [name for name, work_start, work_end in list(ui_work) if work_start < end and work_end > start]
+    busy = ui_busy
+    if busy is not None and busy[1] < end:
+        names.append(f"{busy[0]} (running)")
+    return names
+
+def annotate_timing_gap(gap: dict, arrival: float):
+    """What the wrapper, analytics and UI were doing while the gap opened."""
+    gap["previous_cost"] = last_frame_cost
+    gap["level"] = active_level
+    gap["queue_depth"] = len(analytics.queue)
+    gap["lag"] = analytics.lag
+    gap["ui_work"] = ui_work_during(arrival - gap["arrival_interval"], arrival)
+
+def update_frame_timing_state():
+    actions.user.ui_elements_set_state("frame_timing", frame_timing.summary())
+
+def add_frame_to_drift(frame: ParrotTesterFrame):
+    changed = False
+    for p in frame.patterns:
+        if p["status"] == "detected" or p["status"] == "grace_detected":
+            changed = drift_detector.add(p["name"], frame.power, p["probability"]) or changed
+    if changed:
+        notify_ui("drift", drift_detector.get_alerts())
+
+def reset_drift_baseline():
+    """Start a new baseline from the next detections, e.g. after adjusting the mic."""
+    drift_detector.clear()
+    actions.user.ui_elements_set_state("drift_alerts", [])
+
+def decimate_min_max(ts_from: float, ts_to: float, columns: int) -> dict:
+    """
+    Reduce frame_history to per-column power min/max and per-pattern max probability,
+    so drawing cost depends on the pixel width rather than the number of frames.
+    """
+    power_min = [None] * columns
+    power_max = [None] * columns
+    probabilities: dict[str, list[float]] = {}
+    colors: dict[str, str] = {}
+    span = ts_to - ts_from
+
+    if span > 0:
+        for ts, power, patterns in frame_history.since(ts_from):
+            column = min(columns - 1, int((ts - ts_from) / span * columns))
+            if power_min[column] is None or power < power_min[column]:
+                power_min[column] = power
+            if power_max[column] is None or power > power_max[column]:
+                power_max[column] = power
+            for p in patterns:
+                name = p["name"]
+                column_values = probabilities.get(name)
+                if column_values is None:
+                    column_values = probabilities[name] = [0.0] * columns
+                    colors[name] = p["color"]
+                if p["probability"] > column_values[column]:
+                    column_values[column] = p["probability"]
+
+    return {
+        "power_min": power_min,
+        "power_max": power_max,
+        "probabilities": probabilities,
+        "colors": colors,
+    }
+
 def create_id_from_frame(frame: ParrotTesterFrame) -> str:
     """Create a unique ID from the frame's timestamp and winner name."""
     return f"{frame.format(frame.ts, 3)} {frame.winner_name}" if frame else None
@@ -144,6 +321,7 @@ class Capture:
         detect_frame_index = len(self.frames) - 1
         self._detect_frames = [(detect_frame, detect_frame_index)]
         self.pattern_names = set()
+        self.timing_gaps = []
         for frame in self.frames:
             self.pattern_names.update(frame.pattern_names)
 
@@ -190,98 +368,237 @@ class Capture:
             frame.ts_zero_based = frame.ts - self.frames[0].ts
             frame.id = i + 1
             frame.index = i
+            frame._display = None
+        # Frozen before it's published, so readers never see it change
+        self.frames = tuple(self.frames)
+        # Dropped or late frames within the capture, a miss here may be the audio pipeline
+        self.timing_gaps = frame_timing.gaps_between(self.frames[0].ts, self.frames[-1].ts)
+
+# Older captures are still in the session store when recording is on
+MAX_CAPTURES = 500
 
 class CaptureCollection:
     capture_timeout = "350ms"
-    max_frames_per_capture = 50
+    capture_timeout_seconds = 0.35
+    max_frames_per_capture = 300
 
     def __init__(self):
+        # Off the main thread there is no cron timer, end_if_timed_out() is called instead
+        self.use_timer = True
+        self.last_detect_ts = None
+        self.last_detect_at = None
         self.current_capture: Capture | None = None
-        self.captures: list[Capture] = []
+        # Completed captures only. published is rebuilt once per completed
+        # capture, so snapshot() hands readers the same tuple without copying
+        self.captures: deque[Capture] = deque(maxlen=MAX_CAPTURES)
+        self.published: tuple[Capture, ...] = ()
         self.end_current_capture_job = None
 
+    def snapshot(self) -> tuple[Capture, ...]:
+        return self.published
+
+    def end_if_timed_out(self, ts: float = None):
+        """End the capture by frame time, or by wall time when no frames are arriving."""
+        if self.current_capture is None or self.use_timer or self.last_detect_ts is None:
+            return
+        if ts is not None:
+            if ts - self.last_detect_ts >= self.capture_timeout_seconds:
+                self.end_current_capture()
+        elif time.perf_counter() - self.last_detect_at >= self.capture_timeout_seconds:
+            self.end_current_capture()
+
     def add(self, frame: ParrotTesterFrame, active: set[str]):
         new_capture = False
+        self.end_if_timed_out(frame.ts)
         if self.current_capture and len(self.current_capture.frames) >= self.max_frames_per_capture:
             self.end_current_capture()
 
         if active:
             if self.current_capture is None:
                 new_capture = True
+                self.max_frames_per_capture = settings.get(
+                    "user.parrot_tester_max_frames_per_capture",
+                    CaptureCollection.max_frames_per_capture
+                )
                 self.current_capture = Capture(frame)
-                self.captures.append(self.current_capture)
             else:
                 self.current_capture.add_detect_frame(frame)
-            if self.end_current_capture_job is not None:
-                cron.cancel(self.end_current_capture_job)
-            self.end_current_capture_job = cron.after(self.capture_timeout, self.end_current_capture)
+            if self.use_timer:
+                if self.end_current_capture_job is not None:
+                    cron.cancel(self.end_current_capture_job)
+                self.end_current_capture_job = cron.after(self.capture_timeout, self.end_current_capture)
+            else:
+                self.last_detect_ts = frame.ts
+                self.last_detect_at = time.perf_counter()
         elif self.current_capture is not None:
             self.current_capture.add_frame(frame)
 
-        if new_capture and actions.user.ui_elements_get_state("tab") == "frames":
-            actions.user.ui_elements_set_state("capture_updating", True)
+        if new_capture:
+            notify_ui("capture_started")
 
     def end_current_capture(self):
         if self.current_capture is not None:
-            self.current_capture.complete()
+            last_capture = self.current_capture
+            last_capture.complete()
+            self.captures.append(last_capture)
+            self.published = tuple(self.captures)
+            session_store.add_capture(last_capture)
 
             self.current_capture = None
             if self.end_current_capture_job is not None:
                 cron.cancel(self.end_current_capture_job)
             self.end_current_capture_job = None
-            last_capture = self.captures[-1] if self.captures else None
-            tab = actions.user.ui_elements_get_state("tab")
-            if tab == "frames":
-                actions.user.ui_elements_set_state("capture_updating", False)
-
-            # double pop pause
-            if actions.user.ui_elements_get_state("double_pop_pause") and last_capture and last_capture.detected_two_pops():
-                actions.user.ui_elements_set_state("play", False)
-                actions.user.ui_elements_toggle_hints(True)
-                restore_patterns_paused()
-            elif tab == "frames":
-                actions.user.ui_elements_set_state("last_capture", last_capture)
+            notify_ui("capture_ended", last_capture)
 
     def clear(self):
-        self.captures = []
+        self.captures = deque(maxlen=MAX_CAPTURES)
+        self.published = ()
+        self.last_detect_ts = None
+        self.last_detect_at = None
         self.current_capture = None
         if self.end_current_capture_job is not None:
             cron.cancel(self.end_current_capture_job)
             self.end_current_capture_job = None
 
+DETECTION_LOG_PAGE_SIZE = 100
+
 class DetectionLog:
+    """
+    A page of detections. The writer swaps in a new frames tuple on add,
+    at most DETECTION_LOG_PAGE_SIZE long, so snapshot() hands readers the
+    stored tuple without copying.
+    """
     def __init__(self):
-        self.frames: list[ParrotTesterFrame] = []
+        self.frames: tuple[ParrotTesterFrame, ...] = ()
 
     def add(self, frame: ParrotTesterFrame):
-        self.frames.append(frame)
+        self.frames = (*self.frames, frame)
+
+    def snapshot(self) -> tuple[ParrotTesterFrame, ...]:
+        return self.frames
 
     def clear(self):
-        self.frames = []
+        self.frames = ()
 
     def id(self):
         return create_id_from_frame(self.frames[0]) if self.frames else None
 
 class DetectionLogCollection:
     def __init__(self):
-        self.collection: list[DetectionLog] = []
+        # Swapped for a longer tuple when a page fills, readers iterate it as is
+        self.collection: tuple[DetectionLog, ...] = ()
         self.current_log: DetectionLog | None = None
+        # Flat history with indexes for filtering, positions are in ts order
+        self.frames: list[ParrotTesterFrame] = []
+        self.ts_index: list[float] = []
+        # Every pattern with a status in a frame is indexed, not only the winner
+        self.pattern_index: dict[str, list[int]] = {}
+        self.status_index: dict[str, list[int]] = {}
+        self.pattern_status_index: dict[tuple[str, str], list[int]] = {}
 
     def add(self, frame: ParrotTesterFrame):
-        if self.current_log is None or len(self.current_log.frames) >= 20:
+        """Add a frozen frame to the log."""
+        if self.current_log is None or len(self.current_log.frames) >= DETECTION_LOG_PAGE_SIZE:
             self.current_log = DetectionLog()
-            self.collection.append(self.current_log)
+            self.collection = (*self.collection, self.current_log)
         self.current_log.add(frame)
         frame.log_id = self.current_log.id()
 
+        position = len(self.frames)
+        self.frames.append(frame)
+        self.ts_index.append(frame.ts)
+        for p in frame.patterns:
+            status = p["status"]
+            if not status:
+                continue
+            self.pattern_status_index.setdefault((p["name"], status), []).append(position)
+            for index, key in ((self.pattern_index, p["name"]), (self.status_index, status)):
+                positions = index.setdefault(key, [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+    def filter(
+        self,
+        pattern: str = None,
+        status: str = None,
+        min_power: float = None,
+        max_power: float = None,
+        min_probability: float = None,
+        max_probability: float = None,
+        min_ts: float = None,
+        max_ts: float = None,
+        limit: int = 500,
+    ) -> list[ParrotTesterFrame]:
+        """Most recent frames matching all given filters, in chronological order."""
+        # Runs on the main thread while the worker may add or clear(), which swaps the
+        # lists, so every list is read once and positions always index the same one
+        frames = self.frames
+        ts_index = self.ts_index
+        pattern_index = self.pattern_index
+        status_index = self.status_index
+        pattern_status_index = self.pattern_status_index
+        # Positions past this were added after the snapshot
+        count = min(len(frames), len(ts_index))
+        start = bisect_left(ts_index, min_ts, 0, count) if min_ts is not None else 0
+        end = bisect_right(ts_index, max_ts, 0, count) if max_ts is not None else count
+
+        # Walk the matching index, the remaining filters are checked per frame
+        if pattern and status:
+            positions = pattern_status_index.get((pattern, status), [])
+        elif pattern:
+            positions = pattern_index.get(pattern, [])
+        elif status:
+            positions = status_index.get(status, [])
+        else:
+            positions = None
+
+        if positions is not None:
+            positions = positions[bisect_left(positions, start):bisect_left(positions, end)]
+        else:
+            positions = range(start, end)
+
+        results = []
+        for position in reversed(positions):
+            frame = frames[position]
+            if min_power is not None and frame.power < min_power:
+                continue
+            if max_power is not None and frame.power > max_power:
+                continue
+            # Probability of the pattern that matched, or of the winner without a pattern/status filter
+            if pattern or status:
+                match = next((
+                    p for p in frame.patterns
+                    if p["status"] and (not pattern or p["name"] == pattern) and (not status or p["status"] == status)
+                ), None)
+                probability = match["probability"] if match else 0.0
+            else:
+                probability = frame.winner_probability
+            if min_probability is not None and probability < min_probability:
+                continue
+            if max_probability is not None and probability > max_probability:
+                continue
+            results.append(frame)
+            if len(results) >= limit:
+                break
+
+        results.reverse()
+        return results
+
+    def latest_ts(self) -> float | None:
+        return self.ts_index[-1] if self.ts_index else None
+
     def history(self):
         return [log.id() for log in self.collection]
 
-    def current_log_frames(self) -> list[ParrotTesterFrame]:
-        """Get the frames of the current detection log."""
+    def current_log_frames(self) -> tuple[ParrotTesterFrame, ...]:
+        """Get the frames of the current detection log, an immutable snapshot."""
         if self.current_log:
-            return list(self.current_log.frames)
-        return []
+            return self.current_log.snapshot()
+        return ()
+
+    def snapshot(self) -> list[tuple[ParrotTesterFrame, ...]]:
+        """The frames of every page, oldest first."""
+        return [log.snapshot() for log in self.collection]
 
     def get_log_by_id(self, log_id: str) -> DetectionLog | None:
         for log in self.collection:
@@ -290,13 +607,23 @@ class DetectionLogCollection:
         return None
 
     def clear(self):
-        self.collection = []
+        self.collection = ()
         self.current_log = None
+        self.frames = []
+        self.ts_index = []
+        self.pattern_index = {}
+        self.status_index = {}
+        self.pattern_status_index = {}
 
 class PatternsStats:
     def __init__(self):
         self.stats = {}
         self.total_frames = {}
+        # Summaries from the last get_stats(), rebuilt only for dirty patterns
+        self.summaries = {}
+        self.dirty = set()
+        # add_frame may run on another thread than get_stats, dirty is swapped under this lock
+        self.dirty_lock = threading.Lock()
         # Initialize stats structure from patterns in get_patterns_json
         global_patterns = get_patterns_json()
         # print("Initializing PatternsStats with patterns:", global_patterns.keys())
@@ -306,25 +633,35 @@ class PatternsStats:
     def _initialize_pattern_stats(self, pattern_name):
         """Initialize statistics structure for a new pattern."""
         if pattern_name not in self.stats:
-            self.stats[pattern_name] = {
-                "count": 0,
-                "power": {"min": float('inf'), "sum": 0, "max": float('-inf')},
-                "probability": {"min": float('inf'), "sum": 0, "max": float('-inf')},
-                "f0": {"min": float('inf'), "sum": 0, "max": float('-inf')},
-                "f1": {"min": float('inf'), "sum": 0, "max": float('-inf')},
-                "f2": {"min": float('inf'), "sum": 0, "max": float('-inf')}
-            }
+            self.stats[pattern_name] = {"count": 0}
+            for metric in METRICS:
+                self.stats[pattern_name][metric] = {
+                    "count": 0,
+                    "min": float('inf'),
+                    "sum": 0,
+                    "sum_sq": 0,
+                    "max": float('-inf'),
+                    "sketch": QuantileSketch.for_metric(metric),
+                }
             self.total_frames[pattern_name] = 0
+            self.mark_dirty(pattern_name)
+
+    def mark_dirty(self, pattern_name):
+        with self.dirty_lock:
+            self.dirty.add(pattern_name)
 
     def _update_metric(self, pattern_name, metric_name, value):
-        """Update min, sum, and max for a given metric."""
+        """Update min, sum, sum of squares, max and the quantile sketch for a given metric."""
         if value is None:
             return
 
         stats = self.stats[pattern_name][metric_name]
+        stats["count"] += 1
         stats["min"] = min(stats["min"], value)
         stats["sum"] += value
+        stats["sum_sq"] += value * value
         stats["max"] = max(stats["max"], value)
+        stats["sketch"].add(value)
 
     def add_frame(self, frame):
         """Add a single frame's statistics."""
@@ -343,6 +680,7 @@ class PatternsStats:
         self._initialize_pattern_stats(pattern_name)
 
         # Update counts
+        self.mark_dirty(pattern_name)
         self.stats[pattern_name]["count"] += 1
         self.total_frames[pattern_name] += 1
 
@@ -360,60 +698,88 @@ class PatternsStats:
         # print("log_collection.current_log:", log_collection.current_log)
         for pattern in list(self.stats.keys()):
             self.stats[pattern]["count"] = 0
-            for metric in ["power", "probability", "f0", "f1", "f2"]:
+            for metric in METRICS:
+                self.stats[pattern][metric]["count"] = 0
                 self.stats[pattern][metric]["min"] = float('inf')
                 self.stats[pattern][metric]["sum"] = 0
+                self.stats[pattern][metric]["sum_sq"] = 0
                 self.stats[pattern][metric]["max"] = float('-inf')
+                self.stats[pattern][metric]["sketch"].clear()
         self.total_frames = {pattern: 0 for pattern in self.stats}
+        with self.dirty_lock:
+            self.dirty.update(self.stats.keys())
 
         # Process all frames
-        for log in log_collection.collection:
-            for frame in log.frames:
+        for frames in log_collection.snapshot():
+            for frame in frames:
                 # print("adding frame to stats:", frame.id, frame.ts, frame.winner_name)
                 self.add_frame(frame)
 
         return self.get_stats()
 
+    def _summarize_metric(self, pattern_name, metric_name):
+        stats = self.stats[pattern_name][metric_name]
+        total = self.total_frames[pattern_name]
+        return {
+            "min": stats["min"] if stats["min"] != float('inf') else 0,
+            "average": stats["sum"] / total if total > 0 else 0,
+            "max": stats["max"] if stats["max"] != float('-inf') else 0
+        }
+
+    def _summarize(self, pattern_name):
+        return {
+            "name": pattern_name,
+            "count": self.stats[pattern_name]["count"],
+            "power": self._summarize_metric(pattern_name, "power"),
+            "probability": self._summarize_metric(pattern_name, "probability"),
+            "f0": self._summarize_metric(pattern_name, "f0"),
+            "f1": self._summarize_metric(pattern_name, "f1"),
+            "f2": self._summarize_metric(pattern_name, "f2"),
+        }
+
     def get_stats(self):
         """Get the current statistics with averages calculated."""
-        result = {}
-        for pattern_name, stats in self.stats.items():
-            result[pattern_name] = {
-                "name": pattern_name,
+        with self.dirty_lock:
+            dirty, self.dirty = self.dirty, set()
+        for pattern_name in dirty:
+            self.summaries[pattern_name] = self._summarize(pattern_name)
+
+        # New outer dict so UI state sees a change, unchanged entries are reused.
+        # Summaries are replaced rather than updated, so a published dict never changes
+        # A pattern added meanwhile is picked up on the next call
+        return {
+            pattern_name: self.summaries[pattern_name]
+            for pattern_name in list(self.stats)
+            if pattern_name in self.summaries
+        }
+
+    def snapshot(self) -> dict:
+        """Serializable aggregates and sketches, used for session comparison."""
+        return {
+            pattern_name: {
                 "count": stats["count"],
-                "power": {
-                    "min": stats["power"]["min"] if stats["power"]["min"] != float('inf') else 0,
-                    "average": stats["power"]["sum"] / self.total_frames[pattern_name] if self.total_frames[pattern_name] > 0 else 0,
-                    "max": stats["power"]["max"] if stats["power"]["max"] != float('-inf') else 0
+                **{
+                    metric: {
+                        "count": stats[metric]["count"],
+                        "min": stats[metric]["min"] if stats[metric]["min"] != float('inf') else None,
+                        "sum": stats[metric]["sum"],
+                        "sum_sq": stats[metric]["sum_sq"],
+                        "max": stats[metric]["max"] if stats[metric]["max"] != float('-inf') else None,
+                        "sketch": stats[metric]["sketch"].to_dict(),
+                    }
+                    for metric in METRICS
                 },
-                "probability": {
-                    "min": stats["probability"]["min"] if stats["probability"]["min"] != float('inf') else 0,
-                    "average": stats["probability"]["sum"] / self.total_frames[pattern_name] if self.total_frames[pattern_name] > 0 else 0,
-                    "max": stats["probability"]["max"] if stats["probability"]["max"] != float('-inf') else 0
-                },
-                "f0": {
-                    "min": stats["f0"]["min"] if stats["f0"]["min"] != float('inf') else 0,
-                    "average": stats["f0"]["sum"] / self.total_frames[pattern_name] if self.total_frames[pattern_name] > 0 else 0,
-                    "max": stats["f0"]["max"] if stats["f0"]["max"] != float('-inf') else 0
-                },
-                "f1": {
-                    "min": stats["f1"]["min"] if stats["f1"]["min"] != float('inf') else 0,
-                    "average": stats["f1"]["sum"] / self.total_frames[pattern_name] if self.total_frames[pattern_name] > 0 else 0,
-                    "max": stats["f1"]["max"] if stats["f1"]["max"] != float('-inf') else 0
-                },
-                "f2": {
-                    "min": stats["f2"]["min"] if stats["f2"]["min"] != float('inf') else 0,
-                    "average": stats["f2"]["sum"] / self.total_frames[pattern_name] if self.total_frames[pattern_name] > 0 else 0,
-                    "max": stats["f2"]["max"] if stats["f2"]["max"] != float('-inf') else 0
-                }
             }
-
-        return result
+            for pattern_name, stats in self.stats.items()
+        }
 
     def clear(self):
         """Clear all statistics."""
         self.stats = {}
         self.total_frames = {}
+        self.summaries = {}
+        with self.dirty_lock:
+            self.dirty = set()
         # Re-initialize with patterns from get_patterns_json
         global_patterns = get_patterns_json()
         for pattern_name in global_patterns:
@@ -422,31 +788,38 @@ class PatternsStats:
 capture_collection = CaptureCollection()
 detection_log_collection = DetectionLogCollection()
 patterns_stats = None
+stats_lock = threading.Lock()
+stats_update_job = None
+detection_log_filter = {}
 detected_log = []
 log_events = False
 
 def init_stats():
     """Initialize the patterns statistics."""
     global patterns_stats, detection_log_collection
-    if not patterns_stats:
-        patterns_stats = PatternsStats()
-    s = patterns_stats.generate(detection_log_collection)
+    with stats_lock:
+        if not patterns_stats:
+            patterns_stats = PatternsStats()
+        s = patterns_stats.generate(detection_log_collection)
     # print("Generated patterns stats:", s)
     actions.user.ui_elements_set_state("patterns_stats", s)
 
 def add_frame_to_stats(frame: ParrotTesterFrame):
-    """Add a frame to the patterns statistics."""
-    global patterns_stats
-    if patterns_stats is None:
-        init_stats()
-    patterns_stats.add_frame(frame)
+    """
+    Add a frame to the patterns statistics. Stats that aren't initialized yet
+    are skipped, the stats page generates them from the log when it opens.
+    """
+    with stats_lock:
+        if patterns_stats is not None:
+            patterns_stats.add_frame(frame)
 
 def get_stats():
     """Get the current patterns statistics."""
     global patterns_stats
     if patterns_stats is None:
         init_stats()
-    return patterns_stats.get_stats()
+    with stats_lock:
+        return patterns_stats.get_stats()
 
 def get_stats_pretty_print(name: str = None) -> str:
     if name:
@@ -458,15 +831,34 @@ def get_stats_pretty_print(name: str = None) -> str:
 def reset_stats():
     """Reset the patterns statistics."""
     global patterns_stats
-    if patterns_stats:
-        patterns_stats.clear()
+    with stats_lock:
+        if patterns_stats:
+            patterns_stats.clear()
 
 def update_stats_state():
     """Update the Talon UI state with the current patterns statistics."""
     global patterns_stats
     if patterns_stats is None:
         init_stats()
-    actions.user.ui_elements_set_state("patterns_stats", patterns_stats.get_stats())
+    actions.user.ui_elements_set_state("patterns_stats", get_stats())
+
+def schedule_stats_update():
+    """Push stats to the UI at most once per interval during detection bursts."""
+    global stats_update_job
+    if stats_update_job is None:
+        interval = settings.get("user.parrot_tester_stats_update_interval", 100)
+        stats_update_job = cron.after(f"{interval}ms", flush_stats_update)
+
+def flush_stats_update():
+    global stats_update_job
+    stats_update_job = None
+    run_ui_work("stats", update_stats_state)
+
+def cancel_stats_update():
+    global stats_update_job
+    if stats_update_job is not None:
+        cron.cancel(stats_update_job)
+        stats_update_job = None
 
 def format_stats_multiline(entry: dict) -> str:
     lines = [f"{entry['name']} (count: {entry['count']})"]
@@ -476,14 +868,23 @@ def format_stats_multiline(entry: dict) -> str:
     return "\n".join(lines)
 
 def reset_capture_collection():
-    global log_events, patterns_stats
+    global log_events, patterns_stats, last_pop_ts
     buffer.clear()
+    frame_history.clear()
+    minute_rollup.clear()
+    ten_minute_rollup.clear()
+    drift_detector.clear()
+    noise_floor.clear()
+    frame_timing.clear()
     capture_collection.clear()
     detected_log.clear()
     detection_log_collection.clear()
-    if patterns_stats:
-        patterns_stats.clear()
-        patterns_stats = None
+    detection_log_filter.clear()
+    frame_counters["total"] = 0
+    frame_counters["silent"] = 0
+    last_pop_ts = None
+    # Dropped rather than cleared, clear() reloads the patterns JSON that Stop has just cleared
+    patterns_stats = None
     log_events = False
 
 def listen_log_events(enable: bool):
@@ -525,53 +926,621 @@ def detect(pattern, frame):
 
     return detected, grace_detected
 
+THRESHOLD_FRAME_VALUES = {"power", "probability", "f0", "f1", "f2"}
+# Set to True to also run the original grace check and print any disagreement,
+# and to run verify_detect_single_pass on the loaded patterns when wrapping
+VERIFY_DETECT_SINGLE_PASS = False
+
+def compile_thresholds(thresholds: dict) -> list[tuple[str, str, bool, float]] | None:
+    """
+    Turn {">power": 10, ...} into (key, value name, is_greater, threshold) tuples.
+    None if a key isn't a plain frame value comparison, so the caller falls back to match_pattern.
+    """
+    compiled = []
+    for key, threshold in thresholds.items():
+        name = key[1:]
+        if key[:1] not in ("<", ">") or name not in THRESHOLD_FRAME_VALUES:
+            return None
+        compiled.append((key, name, key[0] == ">", threshold))
+    return compiled
+
+def threshold_margins(compiled: list, frame, probability: float) -> dict:
+    """Distance past each normal threshold, positive when it passes."""
+    margins = {}
+    for key, name, is_greater, threshold in compiled:
+        value = probability if name == "probability" else getattr(frame, name)
+        margins[key] = value - threshold if is_greater else threshold - value
+    return margins
+
+def detect_single_pass(pattern, frame, compiled: list | None, probability: float) -> tuple[bool, bool, dict | None]:
+    """
+    Same result as detect(), but a detection during a grace period is classified
+    with the compiled normal thresholds instead of a second match_pattern call.
+    Returns detected, grace_detected and, for a detection, the normal threshold margins.
+    """
+    if compiled is None:
+        detected, grace_detected = detect(pattern, frame)
+        return detected, grace_detected, None
+
+    if not pattern.detect(frame):
+        return False, False, None
+
+    margins = threshold_margins(compiled, frame, probability)
+    grace_detected = False
+    if pattern.timestamps.graceperiod_until and \
+            is_using_grace_thresholds_for_detection(pattern, frame):
+        grace_detected = any(margin <= 0 for margin in margins.values())
+        if VERIFY_DETECT_SINGLE_PASS and grace_detected == force_normal_threshold_detection(pattern, frame):
+            print(f"Parrot Tester: grace check mismatch for {pattern.name} at {frame.ts}: {margins}")
+
+    return True, grace_detected, margins
+
+def verify_detect_single_pass(parrot_delegate, samples: int = 200, seed: int = 0) -> list[str]:
+    """
+    Compare the margin based normal threshold check with the original match_pattern one
+    on seeded frames at and around each pattern's thresholds. Returns the mismatches.
+    Recorded sessions can't be replayed, the session store doesn't keep frame classes.
+    """
+    rng = random.Random(seed)
+    patterns_json = get_patterns_json() or {}
+    mismatches = []
+    for pattern in parrot_delegate.patterns.values():
+        compiled = compile_thresholds(patterns_json.get(pattern.name, {}).get("threshold", {}))
+        if not compiled or not pattern.labels:
+            continue
+        label = sorted(pattern.labels)[0]
+        for _ in range(samples):
+            values = {"power": 0.0, "probability": 0.0, "f0": 0.0, "f1": 0.0, "f2": 0.0}
+            for _key, name, _is_greater, threshold in compiled:
+                values[name] = threshold + rng.choice((-1, 0, 1)) * rng.uniform(0, abs(threshold) * 0.1 + 0.01)
+            probability = values.pop("probability")
+            frame = SimpleNamespace(ts=0.0, classes={label: probability}, **values)
+            compiled_pass = all(margin > 0 for margin in threshold_margins(compiled, frame, probability).values())
+            if compiled_pass != force_normal_threshold_detection(pattern, frame):
+                mismatches.append(f"{pattern.name}: power {frame.power}, probability {probability}, compiled {compiled_pass}")
+    return mismatches
+
+RECORDING_LEVELS = ["off", "detections", "captures", "full"]
+# Smoothing for the per-frame cost average, roughly the last 100 frames
+RECORDING_COST_ALPHA = 0.01
+
+WATCHDOG_WINDOW = 200
+WATCHDOG_CHECK_EVERY = 50
+# Wait this long on a lighter step before trying a heavier one again,
+# doubled every time a step up has to be undone
+WATCHDOG_HOLD_SECONDS = 10
+WATCHDOG_MAX_HOLD_SECONDS = 600
+WATCHDOG_RECOVER_RATIO = 0.5
+# Consecutive checks over budget, or under the recover ratio, before stepping
+WATCHDOG_CONFIRM_CHECKS = 3
+# Stand-in for the original pattern_match's cost until it's measured at the off level.
+# Low on purpose, overhead is overestimated rather than missed
+WATCHDOG_PASSTHROUGH_SEED = 10e-6
+
+# recording_level is what the user picked, active_level is what runs after the watchdog
+recording_level = "full"
+# Last value of the recording level setting that was applied, a UI pick survives Pause -> Start
+recording_level_setting = None
+recording_ladder = [("full", True)]
+active_level = "full"
+ui_pushes = True
+# Run by record() before its next frame, on the worker or the audio thread, whichever records
+recorder_tasks: deque = deque()
+recording_costs = {level: None for level in RECORDING_LEVELS}
+# The original pattern_match alone, the off level's cost also has the tester's frame timing
+passthrough_costs = {"off": None}
+frame_counters = {"total": 0, "silent": 0}
+
+def add_recording_cost(level: str, seconds: float, costs: dict | None = None):
+    if costs is None:
+        costs = recording_costs
+    cost = costs[level]
+    costs[level] = seconds if cost is None else cost + RECORDING_COST_ALPHA * (seconds - cost)
+
+def passthrough_cost() -> float:
+    """Cost of the original pattern_match, seeded until the off level has run."""
+    cost = passthrough_costs["off"]
+    return cost if cost is not None else WATCHDOG_PASSTHROUGH_SEED
+
+def get_recording_costs() -> dict:
+    """Average per-frame cost of each level in microseconds, None if not measured yet."""
+    return {level: cost * 1e6 if cost is not None else None for level, cost in recording_costs.items()}
+
+def get_frame_counters() -> dict:
+    return dict(frame_counters)
+
+def get_silence_power_threshold(pattern_names) -> float:
+    """
+    Lowest >power any pattern can detect at, grace thresholds included.
+    0 when a pattern has no >power threshold, since then power can't rule it out.
+    """
+    lowest = None
+    for name in pattern_names:
+        power = get_pattern_power_threshold(name)
+        if not power:
+            return 0.0
+        grace_power = get_pattern_grace_power_threshold(name)
+        if grace_power and grace_power < power:
+            power = grace_power
+        if lowest is None or power < lowest:
+            lowest = power
+    return lowest or 0.0
+
+def get_probability_floor(pattern_names) -> float | None:
+    """
+    Lowest probability a pattern needs to be detected or shown.
+    None when a pattern has no >probability threshold, since then every pattern must be evaluated.
+    """
+    lowest = ParrotTesterFrame.THRESHOLD_PROBABILITY
+    for name in pattern_names:
+        probability = get_pattern_probability_threshold(name)
+        if probability is None:
+            return None
+        if probability < lowest:
+            lowest = probability
+    return lowest
+
+class LatencyWatchdog:
+    """
+    Keeps the tester's per-frame overhead over the original pattern_match within
+    a budget, by stepping down a ladder of lighter modes and back up when load drops.
+    """
+    def __init__(self):
+        self.budget = 0.0
+        self.step = 0
+        self.transitions: deque[dict] = deque(maxlen=20)
+        self.reset()
+
+    def configure(self, budget_us: int):
+        """Budget in microseconds, 0 disables the watchdog."""
+        self.budget = max(budget_us, 0) / 1e6
+        self.reset()
+
+    def reset(self):
+        self.step = 0
+        self.hold = WATCHDOG_HOLD_SECONDS
+        self.window = RollingWindow(WATCHDOG_WINDOW)
+        self.frames = 0
+        self.over_checks = 0
+        self.under_checks = 0
+        self.changed_at = time.perf_counter()
+
+    def overhead(self) -> float | None:
+        count = len(self.window.values)
+        return self.window.sum / count if count else None
+
+    def add(self, overhead: float, max_step: int) -> int | None:
+        """Returns the new step when it changes."""
+        if not self.budget:
+            return None
+        self.window.add(overhead)
+        self.frames += 1
+        if self.frames % WATCHDOG_CHECK_EVERY or not self.window.full():
+            return None
+
+        mean = self.overhead()
+        self.over_checks = self.over_checks + 1 if mean > self.budget else 0
+        self.under_checks = self.under_checks + 1 if mean < self.budget * WATCHDOG_RECOVER_RATIO else 0
+        if self.over_checks >= WATCHDOG_CONFIRM_CHECKS and self.step < max_step:
+            step = self.step + 1
+            if self.transitions and self.transitions[-1]["to"] < self.transitions[-1]["from"]:
+                self.hold = min(self.hold * 2, WATCHDOG_MAX_HOLD_SECONDS)
+        elif self.under_checks >= WATCHDOG_CONFIRM_CHECKS and self.step > 0 and \
+                time.perf_counter() - self.changed_at >= self.hold:
+            step = self.step - 1
+        else:
+            return None
+
+        self.transitions.append({"at": time.time(), "from": self.step, "to": step, "overhead_us": mean * 1e6})
+        self.step = step
+        self.changed_at = time.perf_counter()
+        # The new step is judged on its own frames
+        self.window = RollingWindow(WATCHDOG_WINDOW)
+        self.over_checks = 0
+        self.under_checks = 0
+        return step
+
+watchdog = LatencyWatchdog()
+
+def degradation_ladder(level: str, recording_async: bool = False) -> list[tuple[str, bool]]:
+    """
+    (recording level, UI pushes) from the selected level down to a passthrough.
+    With async recording the audio thread does the same evaluate and submit at every
+    level, the lighter levels only help the worker, so the only step is the passthrough.
+    """
+    if level == "off":
+        return [("off", False)]
+    if recording_async:
+        return [(level, True), ("off", False)]
+    index = RECORDING_LEVELS.index(level)
+    ladder = [(RECORDING_LEVELS[i], True) for i in range(index, 0, -1)]
+    ladder.append(("detections", False))
+    ladder.append(("off", False))
+    return ladder
+
+def describe_step(level: str, pushes: bool) -> str:
+    return level if pushes or level == "off" else f"{level} without UI updates"
+
+def clear_unused_collections(level: str):
+    index = RECORDING_LEVELS.index(level)
+    if index < RECORDING_LEVELS.index("captures"):
+        buffer.clear()
+    if index < RECORDING_LEVELS.index("full"):
+        frame_history.clear()
+
+def apply_level(level: str, pushes: bool):
+    """Called from the audio or main thread, the clears run where frames are recorded."""
+    global active_level, ui_pushes
+    recorder_tasks.append(lambda: clear_unused_collections(level))
+    active_level = level
+    ui_pushes = pushes
+
+def on_watchdog_step(step: int):
+    level, pushes = recording_ladder[step]
+    transition = watchdog.transitions[-1]
+    direction = "down" if transition["to"] > transition["from"] else "up"
+    print(
+        f"Parrot Tester: overhead {transition['overhead_us']:.0f}µs "
+        f"(budget {watchdog.budget * 1e6:.0f}µs), stepping {direction} to {describe_step(level, pushes)}"
+    )
+    apply_level(level, pushes)
+
+def get_watchdog_state() -> dict:
+    level, pushes = recording_ladder[watchdog.step]
+    overhead = watchdog.overhead()
+    return {
+        "budget_us": watchdog.budget * 1e6,
+        "overhead_us": overhead * 1e6 if overhead is not None else None,
+        "step": watchdog.step,
+        "description": describe_step(level, pushes),
+        "transitions": list(watchdog.transitions),
+    }
+
+def apply_recording_level_setting():
+    """Use the setting on first wrap or when it changed, otherwise restart from the level already picked."""
+    global recording_level_setting
+    level = settings.get("user.parrot_tester_recording_level", "full")
+    if level == recording_level_setting:
+        set_recording_level(recording_level)
+        return
+    recording_level_setting = level
+    if level not in RECORDING_LEVELS:
+        print(f"Parrot Tester: unknown recording level '{level}', using 'full'")
+        level = "full"
+    set_recording_level(level)
+
+def set_recording_level(level: str):
+    """
+    off: passthrough to the original pattern_match
+    detections: detection log, stats and rollups only
+    captures: adds the pre-roll buffer and captures
+    full: adds the timeline history and noise floor
+    The watchdog starts over from the new level.
+    """
+    global recording_level, recording_ladder
+    if level not in RECORDING_LEVELS:
+        raise ValueError(f"Unknown recording level: {level}")
+    recording_level = level
+    recording_ladder = degradation_ladder(level, analytics.running)
+    watchdog.reset()
+    apply_level(level, level != "off")
+    actions.user.ui_elements_set_state("recording_level", level)
+
+last_pop_ts = None
+
+analytics = AnalyticsPipeline()
+analytics_dispatch_job = None
+# UI state read on the main thread, so the analytics worker never calls actions
+ui_view = (None, False)
+ui_events: deque[tuple[str, object]] = deque()
+
+def get_ui_view() -> tuple[str | None, bool]:
+    """Current tab and minimized state."""
+    if analytics.running:
+        return ui_view
+    return actions.user.ui_elements_get_state("tab"), actions.user.ui_elements_get_state("minimized")
+
+def notify_ui(kind: str, payload=None):
+    """Queue a UI update, applied right away unless the analytics worker is running."""
+    ui_events.append((kind, payload))
+    if not analytics.running:
+        dispatch_ui_events()
+
+def pause_for_double_pop():
+    actions.user.ui_elements_set_state("play", False)
+    actions.user.ui_elements_toggle_hints(True)
+    restore_patterns_paused()
+
+def track_double_pop(ts: float):
+    """
+    The detections level has no captures, so two pops within the
+    capture timeout of each other count as a double pop instead.
+    """
+    global last_pop_ts
+    if last_pop_ts is not None and ts - last_pop_ts < CaptureCollection.capture_timeout_seconds:
+        last_pop_ts = None
+        notify_ui("double_pop")
+    else:
+        last_pop_ts = ts
+
+def on_capture_ended(last_capture):
+    tab = actions.user.ui_elements_get_state("tab")
+    if tab == "frames":
+        actions.user.ui_elements_set_state("capture_updating", False)
+
+    # double pop pause
+    if actions.user.ui_elements_get_state("double_pop_pause") and last_capture and last_capture.detected_two_pops():
+        pause_for_double_pop()
+    elif tab == "frames":
+        actions.user.ui_elements_set_state("frames_window_start", 0)
+        actions.user.ui_elements_set_state("last_capture", last_capture)
+
+def dispatch_ui_events():
+    run_ui_work("ui events", apply_ui_events)
+    if analytics_dispatch_job is not None and not analytics.running:
+        finish_analytics_stop()
+
+def apply_ui_events():
+    """Runs on the main thread. Bursts of detections are coalesced into one update."""
+    global ui_view
+    ui_view = (actions.user.ui_elements_get_state("tab"), actions.user.ui_elements_get_state("minimized"))
+    highlight = set()
+    detection_log = False
+    stats = False
+    while ui_events:
+        kind, payload = ui_events.popleft()
+        if kind == "highlight":
+            highlight.update(payload)
+        elif kind == "detection_log":
+            detection_log = True
+        elif kind == "stats":
+            stats = True
+        elif kind == "drift":
+            actions.user.ui_elements_set_state("drift_alerts", payload)
+        elif kind == "capture_started":
+            if ui_view[0] == "frames":
+                actions.user.ui_elements_set_state("capture_updating", True)
+        elif kind == "capture_ended":
+            on_capture_ended(payload)
+        elif kind == "double_pop":
+            if actions.user.ui_elements_get_state("double_pop_pause"):
+                pause_for_double_pop()
+
+    for name in highlight:
+        actions.user.ui_elements_highlight_briefly(f"pattern_{name}")
+    if detection_log:
+        populate_detection_log_state()
+    if stats:
+        schedule_stats_update()
+
+def start_analytics(record):
+    global analytics_dispatch_job
+    dispatch_ui_events()
+    capture_collection.use_timer = False
+    analytics.reset_metrics()
+    analytics.start(record, on_idle=capture_collection.end_if_timed_out)
+    if analytics_dispatch_job is None:
+        analytics_dispatch_job = cron.interval("30ms", dispatch_ui_events)
+
+def end_recording(reset: bool = False):
+    """End any open capture, and with reset the session and every collection."""
+    capture_collection.end_current_capture()
+    if reset:
+        session_store.end_session()
+        reset_capture_collection()
+
+def stop_analytics(reset: bool = False):
+    """
+    Ask the worker to stop without waiting for it. end_recording runs on the worker
+    after the records already queued, dispatch_ui_events finishes up once it has exited.
+    """
+    if not analytics.running:
+        end_recording(reset)
+        return
+    analytics.stop(then=lambda: end_recording(reset))
+
+def finish_analytics_stop():
+    """Main thread side of stop_analytics, once the worker has exited."""
+    global analytics_dispatch_job
+    if analytics_dispatch_job is not None:
+        cron.cancel(analytics_dispatch_job)
+        analytics_dispatch_job = None
+    capture_collection.use_timer = True
+    dispatch_ui_events()
+
+def get_analytics_metrics() -> dict:
+    return analytics.metrics()
+
 def wrap_pattern_match(parrot_delegate):
-    pattern_index = {
-        name: index for index, name in enumerate(parrot_delegate.patterns.keys())
+    pattern_colors = {
+        name: get_color(index) for index, name in enumerate(parrot_delegate.patterns.keys())
     }
+    silence_power = get_silence_power_threshold(parrot_delegate.patterns.keys())
+    patterns = list(parrot_delegate.patterns.values())
+    all_patterns = list(range(len(patterns)))
+    patterns_json = get_patterns_json() or {}
+    # Only the active patterns of the loaded parrot_integration are indexed by label,
+    # a delegate pattern missing from it has no known thresholds and is always evaluated
+    active_patterns = [
+        index for index, pattern in enumerate(patterns) if not patterns_json or pattern.name in patterns_json
+    ]
+    unindexed_patterns = [index for index in all_patterns if index not in active_patterns]
+    label_index: dict[str, list[int]] = {}
+    for index in active_patterns:
+        for label in patterns[index].labels:
+            label_index.setdefault(label, []).append(index)
+    label_items = list(label_index.items())
+    pattern_labels = tuple({label for pattern in patterns for label in pattern.labels})
+    # A pattern's probability is the sum of its labels, so it can only pass
+    # the floor if one of its labels is above floor / most labels
+    max_labels = max((len(patterns[index].labels) for index in active_patterns), default=1)
+    probability_floor = get_probability_floor(patterns[index].name for index in active_patterns)
+    label_floor = probability_floor / max_labels if probability_floor is not None else None
+    display_floor = ParrotTesterFrame.THRESHOLD_PROBABILITY / max_labels
+    compiled_thresholds = [
+        compile_thresholds(patterns_json[pattern.name].get("threshold", {})) if pattern.name in patterns_json else None
+        for pattern in patterns
+    ]
+
+    def reachable_patterns(frame: ParrotFrame) -> list[int]:
+        """Indexes of patterns that could detect or be shown, in pattern order."""
+        if label_floor is None:
+            return all_patterns
+        classes = frame.classes
+        reachable = set(unindexed_patterns)
+        # Walk whichever side is smaller, the frame's labels or the active patterns' labels
+        if len(classes) < len(label_items):
+            for label, probability in classes.items():
+                if probability > label_floor and label in label_index:
+                    reachable.update(label_index[label])
+        else:
+            for label, indexes in label_items:
+                if classes.get(label, 0) > label_floor:
+                    reachable.update(indexes)
+        return sorted(reachable)
+
+    def is_silent(frame: ParrotFrame, reachable: list[int]) -> bool:
+        """True when no pattern can detect and none would be shown for this frame."""
+        if frame.power >= silence_power:
+            return False
+        if label_floor is not None:
+            return not reachable
+        if unindexed_patterns:
+            return False
+        classes = frame.classes
+        for label in label_index:
+            if classes.get(label, 0) > display_floor:
+                return False
+        return True
 
-    def wrapper(frame: ParrotFrame):
-        active: set[str] = set()
+    def record_silent(frame: ParrotFrame, level: str):
+        if level == "detections":
+            return
+        # Placeholder without patterns so captures keep their pre-roll and tail
         parrot_tester_frame = ParrotTesterFrame(frame)
         buffer.add(parrot_tester_frame)
-
-        for pattern in parrot_delegate.patterns.values():
-            detected, grace_detected = detect(pattern, frame)
-            graceperiod = pattern.timestamps.graceperiod_until > frame.ts
+        capture_collection.add(parrot_tester_frame, set())
+        if level == "full":
+            frame_history.add(frame.ts, frame.power, parrot_tester_frame.patterns)
+            add_frame_to_noise_floor(frame, pattern_labels)
+
+    def evaluate(frame: ParrotFrame) -> tuple[set[str], list | None]:
+        """
+        The only per-frame work on the audio thread: detection, throttling, and
+        a compact result per reachable pattern. None for a silent frame.
+        """
+        active: set[str] = set()
+        frame_counters["total"] += 1
+        reachable = reachable_patterns(frame)
+        if is_silent(frame, reachable):
+            frame_counters["silent"] += 1
+            return active, None
+
+        # Unreachable patterns are below THRESHOLD_PROBABILITY, so they wouldn't be added anyway
+        results = []
+        for index in reachable:
+            pattern = patterns[index]
             probability = sum(frame.classes.get(label, 0) for label in pattern.labels)
+            detected, grace_detected, margins = detect_single_pass(pattern, frame, compiled_thresholds[index], probability)
+            results.append((
+                index,
+                probability,
+                detected,
+                grace_detected,
+                pattern.timestamps.throttled_at > 0 and pattern.timestamps.throttled_until > frame.ts,
+                pattern.timestamps.graceperiod_until > frame.ts,
+                margins,
+            ))
+
+            if detected:
+                active.add(pattern.name)
+                throttles = pattern.get_throttles()
+                parrot_delegate.throttle_patterns(throttles, frame.ts)
+
+        return active, results
+
+    def record(record: tuple):
+        """Builds the tester frame and feeds every collection, on the analytics worker when it runs."""
+        frame, level, active, results = record
+        while recorder_tasks:
+            recorder_tasks.popleft()()
+        if results is None:
+            record_silent(frame, level)
+            return
+
+        parrot_tester_frame = ParrotTesterFrame(frame)
+        if level != "detections":
+            buffer.add(parrot_tester_frame)
+
+        for index, probability, detected, grace_detected, throttled, graceperiod, margins in results:
+            pattern = patterns[index]
             parrot_tester_frame.add_pattern(
                 name=pattern.name,
                 sounds=pattern.labels,
                 probability=probability,
                 detected=detected,
                 grace_detected=grace_detected,
-                throttled=pattern.timestamps.throttled_at > 0 and \
-                    pattern.timestamps.throttled_until > frame.ts,
+                throttled=throttled,
                 graceperiod=graceperiod,
-                color=get_color(pattern_index[pattern.name]),
+                color=pattern_colors[pattern.name],
+                margins=margins,
             )
 
-            if detected:
-                active.add(pattern.name)
-                throttles = pattern.get_throttles()
-                parrot_delegate.throttle_patterns(throttles, frame.ts)
-                detection_log_collection.add(parrot_tester_frame)
-
         parrot_tester_frame.freeze()
-        capture_collection.add(parrot_tester_frame, active)
+        if active:
+            detection_log_collection.add(parrot_tester_frame)
+        if level == "full":
+            frame_history.add(frame.ts, frame.power, parrot_tester_frame.patterns)
+        if parrot_tester_frame.patterns:
+            add_frame_to_rollups(parrot_tester_frame)
+        if level != "detections":
+            capture_collection.add(parrot_tester_frame, active)
+        elif active and parrot_tester_frame.winner_name == "pop":
+            track_double_pop(parrot_tester_frame.ts)
 
         if active:
-            tab = actions.user.ui_elements_get_state("tab")
-            if tab == "patterns":
-                for name in active:
-                    actions.user.ui_elements_highlight_briefly(f"pattern_{name}")
-            elif tab == "detection_log" or tab == "activity" or actions.user.ui_elements_get_state("minimized"):
-                populate_detection_log_state()
-            elif tab == "stats":
+            session_store.add_detection(parrot_tester_frame)
+            add_frame_to_drift(parrot_tester_frame)
+            tab, minimized = get_ui_view()
+            if tab == "stats":
                 add_frame_to_stats(parrot_tester_frame)
-                update_stats_state()
+            if ui_pushes:
+                if tab == "patterns":
+                    notify_ui("highlight", active)
+                elif tab == "detection_log" or tab == "activity" or minimized:
+                    notify_ui("detection_log")
+                elif tab == "stats":
+                    notify_ui("stats")
+        elif level == "full":
+            add_frame_to_noise_floor(frame, pattern_labels)
 
+    def wrapper(frame: ParrotFrame):
+        global last_frame_cost
+        level = active_level
+        start = time.perf_counter()
+        if level == "off":
+            active = original_pattern_match(frame)
+            add_recording_cost("off", time.perf_counter() - start, passthrough_costs)
+        else:
+            active, results = evaluate(frame)
+            if analytics.running:
+                analytics.submit((frame, level, active, results), keep=bool(active))
+            else:
+                record((frame, level, active, results))
+        # Frame timing runs at every level and counts as overhead
+        gap = frame_timing.add(frame.ts, start)
+        if gap is not None:
+            annotate_timing_gap(gap, start)
+        elapsed = time.perf_counter() - start
+        add_recording_cost(level, elapsed)
+        # Overhead over the original pattern_match, whose cost is learned while passing through
+        step = watchdog.add(elapsed - passthrough_cost(), len(recording_ladder) - 1)
+        if step is not None:
+            on_watchdog_step(step)
+        last_frame_cost = elapsed
         return active
+
+    wrapper.record = record
     return wrapper
 
 def set_detection_log_state_by_id(log_id: str):
@@ -581,32 +1550,78 @@ def set_detection_log_state_by_id(log_id: str):
         actions.user.ui_elements_set_state("detection_current_log_frames", detection_log_collection.current_log_frames())
     else:
         log = detection_log_collection.get_log_by_id(log_id)
-        actions.user.ui_elements_set_state("detection_current_log_frames", log.frames if log else [])
+        actions.user.ui_elements_set_state("detection_current_log_frames", log.snapshot() if log else ())
 
 def populate_detection_log_state():
     actions.user.ui_elements_set_state("detection_log_history", detection_log_collection.history())
+    if detection_log_filter:
+        # The page filters when it renders, this only refreshes the current log
+        actions.user.ui_elements_set_state("detection_current_log_frames", detection_log_collection.current_log_frames())
+        return
     log_id = detection_log_collection.current_log.id() if detection_log_collection.current_log else None
     set_detection_log_state_by_id(log_id)
 
+def apply_detection_log_filter(log_filter: dict):
+    """
+    Switch the detection log between the current log and filtered results.
+    The filtering itself runs in filter_detection_log when the page renders.
+    """
+    global detection_log_filter
+    detection_log_filter = {k: v for k, v in log_filter.items() if v not in (None, "")}
+    actions.user.ui_elements_set_state("log_window_start", None)
+    if not detection_log_filter:
+        log_id = detection_log_collection.current_log.id() if detection_log_collection.current_log else None
+        set_detection_log_state_by_id(log_id)
+        return
+
+    actions.user.ui_elements_set_state("detection_current_log_id", None)
+    actions.user.ui_elements_set_state("detection_current_log_frames", detection_log_collection.current_log_frames())
+
+def filter_detection_log(log_filter: dict) -> list[ParrotTesterFrame] | None:
+    """Frames matching log_filter, or None if it's empty. "seconds" is relative to the latest detection."""
+    filter_args = {k: v for k, v in log_filter.items() if v not in (None, "")}
+    if not filter_args:
+        return None
+    seconds = filter_args.pop("seconds", None)
+    latest_ts = detection_log_collection.latest_ts()
+    if seconds and latest_ts is not None:
+        filter_args["min_ts"] = latest_ts - seconds
+    return detection_log_collection.filter(**filter_args)
+
 original_pattern_match = None
+wrapped_delegate = None
 
 def get_current_log_by_id(log_id: str) -> DetectionLog | None:
     """Get the current detection log by ID."""
     return detection_log_collection.get_log_by_id(log_id)
 
 def parrot_tester_wrap_parrot_integration(parrot_delegate):
-    global original_pattern_match
+    global original_pattern_match, wrapped_delegate
     if original_pattern_match is None:
         original_pattern_match = parrot_delegate.pattern_match
+        wrapped_delegate = parrot_delegate
+        if VERIFY_DETECT_SINGLE_PASS:
+            mismatches = verify_detect_single_pass(parrot_delegate)
+            print(f"Parrot Tester: single pass grace check, {len(mismatches)} mismatches", *mismatches[:10], sep="\n")
         parrot_delegate.pattern_match = wrap_pattern_match(parrot_delegate)
+        frame_timing.resume()
+        if settings.get("user.parrot_tester_async_analytics", True):
+            start_analytics(parrot_delegate.pattern_match.record)
+        watchdog.configure(settings.get("user.parrot_tester_overhead_budget", 200))
+        apply_recording_level_setting()
+        if settings.get("user.parrot_tester_session_store", False):
+            session_store.start_session(get_patterns_json())
         print("parrot_integration.py wrapped")
 
 def parrot_tester_restore_parrot_integration(parrot_delegate, reset_ui_state=True):
-    global original_pattern_match
+    global original_pattern_match, wrapped_delegate
     if original_pattern_match is not None:
         parrot_delegate.pattern_match = original_pattern_match
         original_pattern_match = None
+        wrapped_delegate = None
+    stop_analytics(reset=reset_ui_state)
 
     if reset_ui_state:
-        reset_capture_collection()
+        cancel_stats_update()
+        actions.user.ui_elements_set_state("log_window_start", None)
     print("parrot_integration.py restored")
@@ -1,16 +1,76 @@
 
 from talon import Module, actions
-from .ui.app import parrot_tester_toggle
+import time
 
 mod = Module()
 mod.tag("parrot_tester", "mode for testing parrot")
+mod.setting(
+    "parrot_tester_max_frames_per_capture",
+    type=int,
+    default=300,
+    desc="Maximum number of frames kept in a single capture before a new one is started",
+)
+mod.setting(
+    "parrot_tester_stats_update_interval",
+    type=int,
+    default=100,
+    desc="Minimum time in milliseconds between stats page updates during detections",
+)
+mod.setting(
+    "parrot_tester_session_store",
+    type=bool,
+    default=False,
+    desc="Persist detections and captures to a local SQLite database for querying across sessions",
+)
+mod.setting(
+    "parrot_tester_async_analytics",
+    type=bool,
+    default=True,
+    desc="Record frames on a background thread so the tester adds as little as possible to detection",
+)
+mod.setting(
+    "parrot_tester_overhead_budget",
+    type=int,
+    default=200,
+    desc="Per-frame overhead budget in microseconds, the tester records less while it's exceeded. 0 to disable",
+)
+mod.setting(
+    "parrot_tester_recording_level",
+    type=str,
+    default="full",
+    desc="How much the tester records per frame: off, detections, captures or full",
+)
 
 @mod.action_class
 class Actions:
     def parrot_tester_toggle():
         """Toggle parrot tester"""
+        # Imported on demand so the UI isn't loaded until the tester is opened
+        from .ui.app import parrot_tester_toggle
         parrot_tester_toggle()
 
+    def parrot_tester_profile(seconds: int = 10, memory: bool = False):
+        """Profile the parrot tester for a number of seconds and write a report to parrot_tester_profiles"""
+        from .parrot_integration_profile import start_profile
+        start_profile(seconds, memory)
+
+    def parrot_tester_query_detections(pattern: str, min_power: float = None, max_power: float = None, days: float = None, limit: int = 1000) -> list:
+        """Stored detections of a pattern across sessions, newest first, e.g. pops below power 12 in the last 7 days"""
+        from .parrot_integration_store import query_detections
+        since = time.time() - days * 86400 if days else None
+        return query_detections(pattern, min_power=min_power, max_power=max_power, since=since, limit=limit)
+
+    def parrot_tester_query_captures(patterns: str, days: float = None, limit: int = 1000) -> list:
+        """Stored captures where all of the space separated patterns occurred, newest first"""
+        from .parrot_integration_store import query_captures_with_patterns
+        since = time.time() - days * 86400 if days else None
+        return query_captures_with_patterns(patterns.split(), since=since, limit=limit)
+
+    def parrot_tester_query_pattern_aggregates(session_id: int) -> dict:
+        """Per-pattern count and power/probability sums, min and max of a stored session"""
+        from .parrot_integration_store import query_pattern_aggregates
+        return query_pattern_aggregates(session_id)
+
     def parrot_tester_integration_ready():
         """Overrides with True when hook is created/ready"""
         return False
@@ -1,36 +1,52 @@
-from talon import actions
+from talon import actions, cron
+import importlib
 from ..parrot_integration_controller import (
     restore_patterns_paused,
     restore_patterns,
     parrot_tester_initialize,
 )
-from .page_about import page_about
-from .page_detection_log import page_detection_log
-from .page_frames import page_frames
-from .page_patterns import page_patterns
-from .page_stats import page_stats
-from .page_settings import page_settings
-from .page_activity import page_activity
-from .components import last_detection, table_controls
+from .components import last_detection
 from .colors import (
     ACTIVE_COLOR,
     BG_DARKEST,
     BG_DARK,
+    BG_INPUT,
     BORDER_COLOR,
+    GRAY_SOFT,
     PLAY_COLOR,
+    THROTTLE_COLOR,
     WINDOW_BORDER_COLOR,
 )
 
+# Pages are resolved on first render of their tab. Talon loads every file in the user
+# directory anyway, so this keeps app.py and the pages off the import chain of
+# parrot_tester.py and the wrapper rather than saving startup time
 TAB_ID_TO_PAGE = {
-    "frames": page_frames,
-    "detection_log": page_detection_log,
-    "activity": page_activity,
-    "patterns": page_patterns,
-    "stats": page_stats,
-    # "settings": page_settings,
-    "about": page_about,
+    "frames": ("page_frames", "page_frames"),
+    "detection_log": ("page_detection_log", "page_detection_log"),
+    "activity": ("page_activity", "page_activity"),
+    "timeline": ("page_timeline", "page_timeline"),
+    "patterns": ("page_patterns", "page_patterns"),
+    "stats": ("page_stats", "page_stats"),
+    "compare": ("page_compare", "page_compare"),
+    "diagnostics": ("page_diagnostics", "page_diagnostics"),
+    # "settings": ("page_settings", "page_settings"),
+    "about": ("page_about", "page_about"),
 }
 
+loaded_pages = {}
+recording_costs_job = None
+
+def get_page(tab_id: str):
+    """Resolve a page component, importing its module on first use."""
+    page = loaded_pages.get(tab_id)
+    if page is None:
+        module_name, page_name = TAB_ID_TO_PAGE[tab_id]
+        module = importlib.import_module(f".{module_name}", __package__)
+        page = getattr(module, page_name)
+        loaded_pages[tab_id] = page
+    return page
+
 def parrot_tester_pause():
     restore_patterns_paused()
 
@@ -115,14 +131,124 @@ def play_button():
         text("PAUSE" if play else "Start listening"),
     ]
 
+def update_recording_costs_state():
+    # The wrapper is imported where it's used, so loading this module stays cheap
+    from ..parrot_integration_wrapper import (
+        get_analytics_metrics,
+        get_frame_counters,
+        get_recording_costs,
+        get_watchdog_state,
+    )
+    actions.user.ui_elements_set_state("recording_costs", get_recording_costs())
+    actions.user.ui_elements_set_state("frame_counters", get_frame_counters())
+    actions.user.ui_elements_set_state("analytics_metrics", get_analytics_metrics())
+    actions.user.ui_elements_set_state("watchdog", get_watchdog_state())
+
+def start_recording_costs_refresh(e=None):
+    global recording_costs_job
+    if recording_costs_job is None:
+        recording_costs_job = cron.interval("1s", update_recording_costs_state)
+
+def stop_recording_costs_refresh(e=None):
+    global recording_costs_job
+    if recording_costs_job is not None:
+        cron.cancel(recording_costs_job)
+        recording_costs_job = None
+
+def recording_level_tabs():
+    from ..parrot_integration_wrapper import RECORDING_LEVELS, set_recording_level
+    div, button, text, state, effect = actions.user.ui_elements(["div", "button", "text", "state", "effect"])
+    level = state.get("recording_level", "full")
+    costs = state.get("recording_costs", {})
+    counters = state.get("frame_counters", {})
+    total = counters.get("total", 0)
+    analytics = state.get("analytics_metrics", {})
+    watchdog = state.get("watchdog", {})
+
+    effect(start_recording_costs_refresh, stop_recording_costs_refresh, [])
+
+    return div(flex_direction="row", align_items="center", gap=8)[
+        text(
+            f"Over budget ({watchdog['overhead_us']:.0f}/{watchdog['budget_us']:.0f}µs): {watchdog['description']}",
+            font_size=12,
+            color=THROTTLE_COLOR,
+        ) if watchdog.get("step") else None,
+        text(
+            f"Silent {100 * counters['silent'] / total:.0f}%",
+            font_size=12,
+            color=GRAY_SOFT,
+        ) if total else None,
+        text(
+            f"Queue {analytics['depth']} · lag {analytics['lag_ms']:.1f}ms · dropped {analytics['dropped']} ({analytics['dropped_kept']} detections)",
+            font_size=12,
+            color=THROTTLE_COLOR if analytics["dropped"] else GRAY_SOFT,
+        ) if analytics.get("running") else None,
+        div(
+            flex_direction="row",
+            align_items="flex_end",
+            background_color=BG_INPUT,
+            border_color=BORDER_COLOR,
+            border_width=1,
+        )[
+            *[button(
+                on_click=lambda e, value=value: set_recording_level(value),
+                padding=10,
+                padding_top=4,
+                padding_bottom=4,
+                flex_direction="column",
+                align_items="center",
+                position="relative",
+            )[
+                text(format_label(value), color="FFFFFF"),
+                text(
+                    f"{costs[value]:.0f}µs" if costs.get(value) is not None else "-",
+                    font_size=12,
+                    color=GRAY_SOFT,
+                ),
+                div(
+                    position="absolute",
+                    bottom=0,
+                    background_color=ACTIVE_COLOR,
+                    height=3,
+                    width="100%",
+                    border_radius=2,
+                ) if level == value else None
+            ] for value in RECORDING_LEVELS]
+        ],
+    ]
+
+def drift_alert():
+    from ..parrot_integration_wrapper import reset_drift_baseline
+    div, text, button, state = actions.user.ui_elements(["div", "text", "button", "state"])
+    alerts = state.get("drift_alerts", [])
+
+    if not alerts:
+        return None
+
+    return div(flex_direction="row", align_items="center", gap=8, padding=8, border_top=1, border_color=BORDER_COLOR)[
+        div(flex_direction="column", gap=4)[
+            *[text(
+                f"{alert['name']} {alert['metric']} drifted: "
+                f"{alert['baseline_mean']:.2f} → {alert['recent_mean']:.2f}",
+                color=THROTTLE_COLOR,
+            ) for alert in alerts],
+        ],
+        button(padding=6, border_width=1, border_radius=2, border_color=BORDER_COLOR, on_click=lambda e: reset_drift_baseline())[
+            text("Reset baseline"),
+        ],
+    ]
+
 def minimized_body():
     div = actions.user.ui_elements(["div"])
 
-    return div(flex_direction="row", align_items="center", justify_content="space_between", padding=8)[
-        last_detection(),
-        div(padding=8)[
-            play_button(),
+    return div(flex_direction="column")[
+        div(flex_direction="row", align_items="center", justify_content="space_between", padding=8)[
+            last_detection(),
+            div(padding=8)[
+                play_button(),
+            ],
         ],
+        drift_alert(),
     ]
 
 def parrot_tester_ui():
@@ -131,6 +257,7 @@ def parrot_tester_ui():
     ])
     state = actions.user.ui_elements(['state'])
     tab_state = state.get("tab", next(iter(TAB_ID_TO_PAGE)))
+    page = get_page(tab_state)
 
     style({
         "*": {
@@ -163,12 +290,13 @@ def parrot_tester_ui():
         )[
             div(flex_direction="row", align_items="stretch", justify_content="space_between", border_bottom=1, border_color=BORDER_COLOR)[
                 tabs(),
-                div(padding=8)[
+                div(flex_direction="row", align_items="center", gap=16, padding=8)[
+                    component(recording_level_tabs),
                     play_button(),
                 ],
             ],
             div(min_height=750, max_height=900)[
-                component(TAB_ID_TO_PAGE[tab_state]),
+                component(page),
             ]
         ]
     ]
\ No newline at end of file
@@ -2,6 +2,7 @@ from talon import actions
 from ..parrot_integration_controller import (
     get_pattern_json,
     get_pattern_color,
+    get_patterns_version,
 )
 from .colors import (
     ACCENT_COLOR,
@@ -19,6 +20,9 @@ LABEL_FONT = "consolas"
 LABEL_WEIGHT = None
 LABEL_FONT_SIZE = 16
 NUMBER_FONT = "consolas"
+TABLE_WINDOW_ROWS = 30
+
+pattern_view_models = {}
 
 def last_detection(size="small"):
     div, text, state = actions.user.ui_elements(["div", "text", "state"])
@@ -39,12 +43,12 @@ def last_detection(size="small"):
         ),
         div(flex_direction="row", gap=8, align_items="center")[
             text(
-                last_frame.format(last_frame.power, 2) if last_frame else "",
+                last_frame.display["power"] if last_frame else "",
                 font_size=14 if size == "small" else 24,
             ),
             text("/"),
             text(
-                last_frame.format(last_frame.winner["probability"], 3) if last_frame else "",
+                last_frame.display["winner_probability_short"] if last_frame else "",
                 font_size=14 if size == "small" else 24,
             ),
         ],
@@ -135,6 +139,49 @@ def power_ratio_bar(power: float, patterns: list, power_threshold: float = None)
         div(position="absolute", left=power_threshold_left - 1.5, width=1.5, top=0, bottom=0, background_color="#920000") if power_threshold else None,
     ]
 
+def table_window(items: list, start: int | None, rows: int = TABLE_WINDOW_ROWS) -> list:
+    """
+    Only the rows in the current window get built, regardless of list length.
+    A start of None shows the last rows, so a live table follows new entries.
+    """
+    if start is None:
+        start = len(items)
+    start = max(0, min(start, len(items) - rows))
+    return items[start:start + rows]
+
+def table_window_controls(state_key: str, total: int, rows: int = TABLE_WINDOW_ROWS, default: int | None = 0):
+    div, text, icon, button, state = actions.user.ui_elements(["div", "text", "icon", "button", "state"])
+    start, set_start = state.use(state_key, default)
+
+    if total <= rows:
+        return None
+
+    if start is None:
+        start = total
+    start = max(0, min(start, total - rows))
+    end = min(total, start + rows)
+
+    return div(flex_direction="row", gap=4, align_items="center")[
+        button(
+            on_click=lambda e: set_start(max(0, start - rows)),
+            disabled=start == 0,
+            padding=4,
+            border_radius=4,
+        )[
+            icon("chevron_up", size=14, color=SECONDARY_COLOR if start == 0 else "FFFFFF"),
+        ],
+        number(f"{start + 1}-{end} / {total}", color=GRAY_SOFT),
+        button(
+            # Paging onto the last window follows the end again
+            on_click=lambda e: set_start(None if start + 2 * rows >= total else start + rows),
+            disabled=end >= total,
+            padding=4,
+            border_radius=4,
+        )[
+            icon("chevron_down", size=14, color=SECONDARY_COLOR if end >= total else "FFFFFF"),
+        ],
+    ]
+
 def table_controls():
     div, text, icon, button, checkbox, style = actions.user.ui_elements(["div", "text", "icon", "button", "checkbox", "style"])
     state = actions.user.ui_elements("state")
@@ -198,6 +245,41 @@ def tilda_icon():
         path(d="M4 14 Q8 10, 12 14 T20 14")
     ]
 
+def group_pairs(items: list) -> list:
+    return [items[i:i + 2] for i in range(0, len(items), 2)]
+
+def get_pattern_view_model(pattern_name: str) -> dict:
+    """Derived display data for a pattern card, memoized until patterns.json changes."""
+    version = get_patterns_version()
+    cached = pattern_view_models.get(pattern_name)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    pattern_data = get_pattern_json(pattern_name)
+    thresholds = pattern_data.get("threshold", {})
+
+    ordered_thresholds = []
+    if ">power" in thresholds:
+        ordered_thresholds.append((">power", thresholds[">power"]))
+    if ">probability" in thresholds:
+        ordered_thresholds.append((">probability", thresholds[">probability"]))
+
+    for key, value in thresholds.items():
+        if key not in [">power", ">probability"]:
+            ordered_thresholds.append((key, value))
+
+    view_model = {
+        "color": get_pattern_color(pattern_name),
+        "sounds": ",".join(pattern_data.get("sounds", [])),
+        "threshold_groups": group_pairs(ordered_thresholds),
+        "throttle_groups": group_pairs(list(pattern_data.get("throttle", {}).items())),
+        "grace_period": pattern_data.get("graceperiod", ""),
+        "grace_threshold_groups": group_pairs(list(pattern_data.get("grace_threshold", {}).items())),
+    }
+    # get_pattern_json may have loaded patterns and bumped the version
+    pattern_view_models[pattern_name] = (get_patterns_version(), view_model)
+    return view_model
+
 def pattern(props):
     div, text, icon, button, state = actions.user.ui_elements(["div", "text", "icon", "button", "state"])
     table, tr, td, style = actions.user.ui_elements(["table", "tr", "td", "style"])
@@ -214,8 +296,12 @@ def pattern(props):
         show_throttles = False
         show_grace = False
 
-    pattern_data = get_pattern_json(pattern_name)
-    pattern_color = get_pattern_color(pattern_name)
+    view_model = get_pattern_view_model(pattern_name)
+    pattern_color = view_model["color"]
+    threshold_groups = view_model["threshold_groups"]
+    throttle_groups = view_model["throttle_groups"] if show_throttles else []
+    grace_period = view_model["grace_period"] if show_grace else ""
+    grace_threshold_groups = view_model["grace_threshold_groups"] if show_grace else []
 
     style({
         "th": {
@@ -232,20 +318,6 @@ def pattern(props):
         },
     })
 
-    if show_throttles:
-        throttle_items = list(pattern_data.get("throttle", {}).items())
-        throttle_groups = [throttle_items[i:i + 2] for i in range(0, len(throttle_items), 2)]
-    else:
-        throttle_groups = []
-
-    if show_grace:
-        grace_period = pattern_data.get("graceperiod", "")
-        grace_threshold_items = list(pattern_data.get("grace_threshold", {}).items())
-        grace_threshold_groups = [grace_threshold_items[i:i + 2] for i in range(0, len(grace_threshold_items), 2)]
-    else:
-        grace_period = ""
-        grace_threshold_groups = []
-
     pattern_props = {
         "padding": 16,
         "padding_top": 12,
@@ -257,20 +329,6 @@ def pattern(props):
     if highlight_when_active:
         pattern_props["id"] = f"pattern_{pattern_name}"
 
-    thresholds = pattern_data.get("threshold", {})
-
-    ordered_thresholds = []
-    if ">power" in thresholds:
-        ordered_thresholds.append((">power", thresholds[">power"]))
-    if ">probability" in thresholds:
-        ordered_thresholds.append((">probability", thresholds[">probability"]))
-
-    for key, value in thresholds.items():
-        if key not in [">power", ">probability"]:
-            ordered_thresholds.append((key, value))
-
-    threshold_groups = [ordered_thresholds[i:i + 2] for i in range(0, len(ordered_thresholds), 2)]
-
     if view == "compact":
         return div(pattern_props)[
             div(flex_direction="row", gap=8, align_items="center", padding_bottom=8, justify_content="space_between")[
@@ -336,7 +394,7 @@ def pattern(props):
         div(align_items="flex_start", border_left=1, border_color=BORDER_COLOR_LIGHTER)[
             div(flex_direction="row", gap=8, margin_left=15, align_items="center")[
                 text("sounds", font_size=LABEL_FONT_SIZE, color=ACCENT_COLOR, font_weight=LABEL_WEIGHT, font_family=LABEL_FONT),
-                text(",".join(pattern_data.get("sounds", []))),
+                text(view_model["sounds"]),
             ] if not small else None,
             table(padding=8, padding_bottom=0)[
                 *[
@@ -0,0 +1,187 @@
+from talon import actions
+import time
+from .components import (
+    number,
+    rect_color,
+    subtitle,
+)
+from .colors import (
+    ACTIVE_COLOR,
+    BG_DARK,
+    BG_DARKEST,
+    BG_GRAY,
+    BORDER_COLOR,
+    GRAY_SOFT,
+    SECONDARY_COLOR,
+    THROTTLE_COLOR,
+)
+from ..parrot_integration_analysis import compare_sessions
+from ..parrot_integration_controller import get_pattern_color
+from ..parrot_integration_store import (
+    load_session_snapshot,
+    query_sessions,
+    session_store,
+)
+from ..parrot_integration_wrapper import format
+
+LIVE_SESSION_ID = "live"
+
+def session_label(session: dict) -> str:
+    started = time.strftime("%Y-%m-%d %H:%M", time.localtime(session["started_at"]))
+    if session["id"] == LIVE_SESSION_ID:
+        return f"{started} (current)"
+    minutes = ((session.get("ended_at") or session["started_at"]) - session["started_at"]) / 60
+    return f"{started} ({minutes:.0f}m{', cut off' if session.get('cut_off') else ''})"
+
+def load_snapshot(session_id):
+    if session_id == LIVE_SESSION_ID:
+        return session_store.live_snapshot()
+    return load_session_snapshot(session_id)
+
+def refresh_sessions(e=None):
+    sessions = []
+    live = session_store.live_snapshot()
+    if live:
+        sessions.append({"id": LIVE_SESSION_ID, "started_at": live["started_at"]})
+    try:
+        sessions.extend(query_sessions())
+    except Exception as error:
+        print(f"Parrot Tester: could not read sessions: {error}")
+    actions.user.ui_elements_set_state("compare_sessions", sessions)
+
+def update_comparison(session_a, session_b):
+    comparison = None
+    if session_a is not None and session_b is not None:
+        snapshot_a = load_snapshot(session_a)
+        snapshot_b = load_snapshot(session_b)
+        if snapshot_a and snapshot_b:
+            comparison = compare_sessions(snapshot_a, snapshot_b)
+    actions.user.ui_elements_set_state("session_comparison", comparison)
+
+def session_list(title: str, state_key: str, other_state_key: str):
+    div, button, state = actions.user.ui_elements(["div", "button", "state"])
+    sessions = state.get("compare_sessions", [])
+    selected, set_selected = state.use(state_key, None)
+    other = state.get(other_state_key, None)
+
+    def select(session_id):
+        set_selected(session_id)
+        if state_key == "compare_session_a":
+            update_comparison(session_id, other)
+        else:
+            update_comparison(other, session_id)
+
+    return div(flex_direction="column", flex=1)[
+        subtitle(title),
+        *[button(
+            margin=1,
+            margin_left=8,
+            margin_right=8,
+            padding=9,
+            border_radius=4,
+            background_color=ACTIVE_COLOR if session["id"] == selected else BG_GRAY,
+            on_click=lambda e, session_id=session["id"]: select(session_id),
+        )[
+            number(session_label(session))
+        ] for session in sessions],
+    ]
+
+def compare_cell(metric: dict, decimals: int):
+    div, text = actions.user.ui_elements(["div", "text"])
+    delta = metric["delta"]
+
+    return div(gap=6, align_items="flex_end")[
+        div(flex_direction="row", gap=6)[
+            number(format(metric["mean_a"], decimals)),
+            text("→", color=GRAY_SOFT),
+            number(format(metric["mean_b"], decimals)),
+        ],
+        number(
+            f"{'+' if delta >= 0 else ''}{format(delta, decimals)}{' *' if metric['significant'] else ''}",
+            color=THROTTLE_COLOR if metric["significant"] else SECONDARY_COLOR,
+        ) if delta is not None else None,
+    ]
+
+def table_comparison():
+    div, text, style, state = actions.user.ui_elements(["div", "text", "style", "state"])
+    table, th, tr, td = actions.user.ui_elements(["table", "th", "tr", "td"])
+    comparison = state.get("session_comparison", None)
+
+    if not comparison:
+        return div(padding=16)[
+            text("Select two sessions to compare", color=GRAY_SOFT),
+        ]
+
+    style({
+        "th": {
+            "padding": 10,
+            "padding_left": 12,
+            "padding_right": 12,
+            "align_items": "flex_end",
+            "border_bottom": 1,
+        },
+        "td": {
+            "padding": 8,
+            "padding_left": 12,
+            "padding_right": 12,
+            "align_items": "flex_end",
+            "border_bottom": 1,
+        },
+    })
+
+    return div(height="100%", overflow_y="scroll")[
+        table(padding=16, padding_top=0)[
+            tr()[
+                th(align_items="flex_start")[text("Pattern", color=SECONDARY_COLOR)],
+                th()[text("Count A / B", color=SECONDARY_COLOR)],
+                th()[text("Per min A / B", color=SECONDARY_COLOR)],
+                th()[text("Power", color=SECONDARY_COLOR)],
+                th()[text("Power p50 / p90", color=SECONDARY_COLOR)],
+                th()[text("Prob.", color=SECONDARY_COLOR)],
+                th()[text("F0", color=SECONDARY_COLOR)],
+                th()[text("F1", color=SECONDARY_COLOR)],
+                th()[text("F2", color=SECONDARY_COLOR)],
+            ],
+            *[tr()[
+                td(align_items="flex_start")[
+                    div(flex_direction="row", gap=8, align_items="center")[
+                        rect_color(get_pattern_color(row["name"]), size=10),
+                        text(row["name"]),
+                    ]
+                ],
+                td()[number(f"{row['count_a']} / {row['count_b']}")],
+                td()[number(f"{format(row['rate_a'], 1)} / {format(row['rate_b'], 1)}")],
+                td()[compare_cell(row["power"], 2)],
+                td()[div(gap=6, align_items="flex_end")[
+                    number(f"A {format(row['power']['p50_a'], 1)} / {format(row['power']['p90_a'], 1)}"),
+                    number(f"B {format(row['power']['p50_b'], 1)} / {format(row['power']['p90_b'], 1)}"),
+                ]],
+                td()[compare_cell(row["probability"], 3)],
+                td()[compare_cell(row["f0"], 0)],
+                td()[compare_cell(row["f1"], 0)],
+                td()[compare_cell(row["f2"], 0)],
+            ] for row in comparison.values()],
+        ],
+    ]
+
+def page_compare():
+    div, component, text = actions.user.ui_elements(["div", "component", "text"])
+    effect = actions.user.ui_elements("effect")
+
+    effect(refresh_sessions, [])
+
+    return div(background_color=BG_DARKEST, flex_direction="row", height=750)[
+        div(flex_direction="column", background_color=BG_GRAY, height=750, border_right=1, border_color=BORDER_COLOR, overflow_y="scroll")[
+            component(session_list, "Session A", "compare_session_a", "compare_session_b"),
+            component(session_list, "Session B", "compare_session_b", "compare_session_a"),
+        ],
+        div(flex_direction="column", flex=1)[
+            div(background_color=BG_DARK, border_color=BORDER_COLOR, border_bottom=1)[
+                div(flex_direction="row", padding=8, align_items="center")[
+                    text("Session comparison", font_size=16, margin_left=8),
+                    text("* significant at 95%", color=GRAY_SOFT, margin_left=24),
+                ],
+            ],
+            component(table_comparison),
+        ],
+    ]
@@ -5,6 +5,8 @@ from .components import (
     status_cell,
     power_ratio_bar,
     table_controls,
+    table_window,
+    table_window_controls,
     subtitle,
 )
 from .colors import (
@@ -12,22 +14,108 @@ from .colors import (
     BORDER_COLOR,
     BG_DARKEST,
     BG_DARK,
+    BG_INPUT,
     ACTIVE_COLOR,
     BG_GRAY,
 )
 from ..parrot_integration_controller import (
-    get_pattern_threshold_value,
+    get_pattern_threshold_display,
 )
 from ..parrot_integration_wrapper import (
+    apply_detection_log_filter,
+    filter_detection_log,
     populate_detection_log_state,
     set_detection_log_state_by_id,
 )
 
-def table_log():
+STATUS_FILTERS = {
+    None: "All",
+    "detected": "Detected",
+    "grace_detected": "Grace",
+    "throttled": "Throttled",
+}
+
+TIME_FILTERS = {
+    None: "All",
+    60: "1m",
+    600: "10m",
+    3600: "1h",
+}
+
+def parse_float(value: str) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def segmented(options: dict, selected, on_select):
+    div, text, button = actions.user.ui_elements(["div", "text", "button"])
+
+    return div(flex_direction="row", background_color=BG_INPUT, border_color=BORDER_COLOR, border_width=1)[
+        *[button(
+            on_click=lambda e, value=value: on_select(value),
+            padding=6,
+            padding_left=10,
+            padding_right=10,
+            background_color=ACTIVE_COLOR if value == selected else BG_INPUT,
+        )[
+            text(label),
+        ] for value, label in options.items()]
+    ]
+
+def filter_bar():
+    div, text, button, input_text, state = actions.user.ui_elements(["div", "text", "button", "input_text", "state"])
+    log_filter, set_log_filter = state.use("detection_log_filter", {})
+    # input_text keeps its own value, new ids on clear mount empty inputs
+    generation, set_generation = state.use("detection_log_filter_generation", 0)
+
+    def update(key, value):
+        new_filter = {**log_filter, key: value}
+        set_log_filter(new_filter)
+        apply_detection_log_filter(new_filter)
+
+    def clear(e):
+        set_log_filter({})
+        set_generation(generation + 1)
+        apply_detection_log_filter({})
+
+    input_props = {
+        "width": 70,
+        "background_color": BG_INPUT,
+        "border_color": BORDER_COLOR,
+        "border_width": 1,
+        "border_radius": 2,
+    }
+
+    return div(flex_direction="row", gap=16, padding=8, align_items="center", flex_wrap=True, border_bottom=1, border_color=BORDER_COLOR)[
+        div(flex_direction="row", gap=8, align_items="center")[
+            text("Pattern", color=SECONDARY_COLOR, for_id=f"filter_pattern_{generation}"),
+            input_text(input_props, id=f"filter_pattern_{generation}", width=100, on_change=lambda e: update("pattern", e.value.strip())),
+        ],
+        segmented(STATUS_FILTERS, log_filter.get("status"), lambda value: update("status", value)),
+        div(flex_direction="row", gap=8, align_items="center")[
+            text("Power", color=SECONDARY_COLOR),
+            input_text(input_props, id=f"filter_min_power_{generation}", on_change=lambda e: update("min_power", parse_float(e.value))),
+            text("-"),
+            input_text(input_props, id=f"filter_max_power_{generation}", on_change=lambda e: update("max_power", parse_float(e.value))),
+        ],
+        div(flex_direction="row", gap=8, align_items="center")[
+            text("Prob.", color=SECONDARY_COLOR),
+            input_text(input_props, id=f"filter_min_probability_{generation}", on_change=lambda e: update("min_probability", parse_float(e.value))),
+            text("-"),
+            input_text(input_props, id=f"filter_max_probability_{generation}", on_change=lambda e: update("max_probability", parse_float(e.value))),
+        ],
+        segmented(TIME_FILTERS, log_filter.get("seconds"), lambda value: update("seconds", value)),
+        button(on_click=clear, padding=6, padding_left=10, padding_right=10, border_color=BORDER_COLOR, border_width=1, border_radius=4)[
+            text("Clear"),
+        ] if log_filter else None,
+    ]
+
+def table_log(log_frames: list):
     div, text, icon, style = actions.user.ui_elements(["div", "text", "icon", "style"])
     table, th, tr, td = actions.user.ui_elements(["table", "th", "tr", "td"])
     state = actions.user.ui_elements(["state"])
-    detection_current_log_frames = state.get("detection_current_log_frames", [])
+    detection_current_log_frames = table_window(log_frames, state.get("log_window_start", None))
     show_formants = state.get("show_formants", False)
     show_thresholds = state.get("show_thresholds", False)
 
@@ -77,30 +165,30 @@ def table_log():
         ],
         *[
             tr()[
-                td()[number(frame.format(frame.ts, 3))],
+                td()[number(frame.display["ts"])],
                 td(align_items="flex_start")[div(gap=8, min_width=60)[
                     text(frame.winner["name"])
                 ]],
                 # td(align_items="flex_start")[div(gap=8)[
                 #     *[text(", ".join(p["sounds"])) for p in frame.patterns]
                 # ]],
-                td(align_items="flex_end")[number(frame.format(frame.power, 2))],
+                td(align_items="flex_end")[number(frame.display["power"])],
                 td(align_items="flex_end")[
-                    number(get_pattern_threshold_value(frame.winner["name"], ">power"))
+                    number(get_pattern_threshold_display(frame.winner["name"])[">power"])
                 ] if show_thresholds else None,
-                td(align_items="flex_end")[number(frame.format(frame.winner["probability"], 4))],
+                td(align_items="flex_end")[number(frame.display["winner_probability"])],
                 td(align_items="flex_end")[
-                    number(get_pattern_threshold_value(frame.winner["name"], ">probability"))
+                    number(get_pattern_threshold_display(frame.winner["name"])[">probability"])
                 ] if show_thresholds else None,
                 *[
                     td(align_items="flex_end", justify_content="center")[
-                        number(str(round(frame.f0))),
+                        number(frame.display["f0"]),
                     ],
                     td(align_items="flex_end", justify_content="center")[
-                        number(str(round(frame.f1))),
+                        number(frame.display["f1"]),
                     ],
                     td(align_items="flex_end", justify_content="center")[
-                        number(str(round(frame.f2))),
+                        number(frame.display["f2"]),
                     ],
                 ] if show_formants else [],
                 td(align_items="center")[div(gap=8, align_items="center")[
@@ -125,6 +213,13 @@ def page_detection_log():
     effect = actions.user.ui_elements("effect")
     detection_log_history = state.get("detection_log_history", [])
     current_log_id, set_current_log_id = state.use("detection_current_log_id", None)
+    # Read either way so new detections re-render a filtered log too
+    current_log_frames = state.get("detection_current_log_frames", [])
+    # Filtered here on render rather than on every detection
+    log_frames = filter_detection_log(state.get("detection_log_filter", {}))
+    if log_frames is None:
+        log_frames = current_log_frames
+    total_frames = len(log_frames)
 
     def on_mount(e):
         if not detection_log_history:
@@ -145,6 +240,7 @@ def page_detection_log():
                 on_click=lambda e, log_id=log_id: (
                     set_current_log_id(log_id),
                     set_detection_log_state_by_id(log_id),
+                    state.set("log_window_start", None),
                 ),
             )[
                 number(log_id)
@@ -155,11 +251,15 @@ def page_detection_log():
                 div(background_color=BG_DARK, border_color=BORDER_COLOR, border_bottom=1)[
                     div(flex_direction="row", padding=8, justify_content="space_between", align_items="center")[
                         text("Detection Log", font_size=16),
-                        component(table_controls),
+                        div(flex_direction="row", gap=16, align_items="center")[
+                            table_window_controls("log_window_start", total_frames, default=None),
+                            component(table_controls),
+                        ],
                     ],
+                    component(filter_bar),
                 ],
                 div(position="relative", flex=1)[
-                    component(table_log),
+                    component(table_log, log_frames),
                 ],
                 div(
                     position="absolute",
@@ -0,0 +1,136 @@
+from talon import actions, cron
+from .components import (
+    number,
+    subtitle,
+)
+from .colors import (
+    BG_DARK,
+    BG_DARKEST,
+    BORDER_COLOR,
+    GRAY_SOFT,
+    SECONDARY_COLOR,
+    THROTTLE_COLOR,
+)
+from ..parrot_integration_wrapper import (
+    format,
+    update_frame_timing_state,
+)
+
+DIAGNOSTICS_MAX_GAPS = 50
+
+frame_timing_job = None
+
+def start_frame_timing_refresh(e=None):
+    global frame_timing_job
+    update_frame_timing_state()
+    if frame_timing_job is None:
+        frame_timing_job = cron.interval("1s", update_frame_timing_state)
+
+def stop_frame_timing_refresh(e=None):
+    global frame_timing_job
+    if frame_timing_job is not None:
+        cron.cancel(frame_timing_job)
+        frame_timing_job = None
+
+def ms(seconds: float | None, decimals: int = 2) -> str:
+    return format(seconds * 1000, decimals) if seconds is not None else "-"
+
+def timing_summary():
+    div, text, state = actions.user.ui_elements(["div", "text", "state"])
+    summary = state.get("frame_timing", None)
+
+    if not summary or summary["hop"] is None:
+        return div(padding=16)[
+            text("Frame timing: waiting for frames", color=GRAY_SOFT),
+        ]
+
+    items = [
+        ("Hop", f"{ms(summary['hop'])} ms", False),
+        ("Interval / jitter", f"{ms(summary['ts_mean'])} / {ms(summary['ts_jitter'])} ms", False),
+        ("Arrival / jitter", f"{ms(summary['arrival_mean'])} / {ms(summary['arrival_jitter'])} ms", False),
+        ("Max interval", f"{ms(summary['max_interval'])} ms", False),
+        ("Dropped", f"{summary['dropped_frames']} frames in {summary['dropped_gaps']} gaps", summary["dropped_gaps"] > 0),
+        ("Late", f"{summary['late_gaps']}", summary["late_gaps"] > 0),
+        ("Pauses", f"{summary['pauses']}", False),
+        ("Frames", f"{summary['frames']}", False),
+    ]
+
+    return div(flex_direction="row", flex_wrap=True, gap=24, padding=16)[
+        *[div(flex_direction="column", gap=6)[
+            text(label, color=SECONDARY_COLOR),
+            number(value, color=THROTTLE_COLOR if warn else "FFFFFF"),
+        ] for label, value, warn in items],
+    ]
+
+def table_gaps():
+    div, text, style, state = actions.user.ui_elements(["div", "text", "style", "state"])
+    table, th, tr, td = actions.user.ui_elements(["table", "th", "tr", "td"])
+    summary = state.get("frame_timing", None)
+    gaps = summary["gaps"][-DIAGNOSTICS_MAX_GAPS:][::-1] if summary else []
+
+    if not gaps:
+        return div(padding=16)[
+            text("No dropped or late frames", color=GRAY_SOFT),
+        ]
+
+    style({
+        "th": {
+            "padding": 10,
+            "padding_left": 12,
+            "padding_right": 12,
+            "align_items": "flex_end",
+            "border_bottom": 1,
+        },
+        "td": {
+            "padding": 8,
+            "padding_left": 12,
+            "padding_right": 12,
+            "align_items": "flex_end",
+            "border_bottom": 1,
+        },
+    })
+
+    return div(height="100%", overflow_y="scroll")[
+        table(padding=16, padding_top=0)[
+            tr()[
+                th(align_items="flex_start")[text("Time", color=SECONDARY_COLOR)],
+                th()[text("Kind", color=SECONDARY_COLOR)],
+                th()[text("Interval ms", color=SECONDARY_COLOR)],
+                th()[text("Arrival ms", color=SECONDARY_COLOR)],
+                th()[text("Missed", color=SECONDARY_COLOR)],
+                th()[text("Prev. call µs", color=SECONDARY_COLOR)],
+                th()[text("Level", color=SECONDARY_COLOR)],
+                th()[text("Queue / lag ms", color=SECONDARY_COLOR)],
+                th(align_items="flex_start")[text("UI work", color=SECONDARY_COLOR)],
+            ],
+            *[tr()[
+                td(align_items="flex_start")[number(format(gap["ts"], 3))],
+                td()[text(gap["kind"], color=THROTTLE_COLOR if gap["kind"] == "dropped" else "FFFFFF")],
+                td()[number(ms(gap["interval"], 1))],
+                td()[number(ms(gap["arrival_interval"], 1))],
+                td()[number(str(gap["missed"]))],
+                td()[number(format(gap["previous_cost"] * 1e6, 0) if "previous_cost" in gap else "-")],
+                td()[text(gap.get("level", "-"))],
+                td()[number(f"{gap.get('queue_depth', '-')} / {ms(gap.get('lag'), 1)}")],
+                td(align_items="flex_start")[text(", ".join(gap.get("ui_work") or []) or "-", color=SECONDARY_COLOR)],
+            ] for gap in gaps],
+        ],
+    ]
+
+def page_diagnostics():
+    div, component, text = actions.user.ui_elements(["div", "component", "text"])
+    effect = actions.user.ui_elements("effect")
+
+    effect(start_frame_timing_refresh, stop_frame_timing_refresh, [])
+
+    return div(background_color=BG_DARKEST, flex_direction="column", height=750)[
+        div(background_color=BG_DARK, border_color=BORDER_COLOR, border_bottom=1)[
+            div(flex_direction="row", padding=8, align_items="center")[
+                text("Frame timing", font_size=16, margin_left=8),
+                text("dropped: gap in audio timestamps, late: frames delivered behind schedule", color=GRAY_SOFT, margin_left=24),
+            ],
+        ],
+        component(timing_summary),
+        subtitle("Recent gaps"),
+        component(table_gaps),
+    ]
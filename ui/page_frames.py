@@ -5,6 +5,8 @@ from .components import (
     status_cell,
     power_ratio_bar,
     table_controls,
+    table_window,
+    table_window_controls,
     pattern,
     subtitle,
 )
@@ -16,6 +18,7 @@ from .colors import (
     BG_GRAY,
     BG_DARKEST,
     BG_DARK,
+    THROTTLE_COLOR,
 )
 
 def detected_patterns():
@@ -54,6 +57,7 @@ def table_frames():
     state = actions.user.ui_elements("state")
     last_capture = state.get("last_capture", None)
     frames = last_capture.frames if last_capture else []
+    frames = table_window(frames, state.get("frames_window_start", 0))
     show_formants = state.get("show_formants", False)
 
     style({
@@ -105,27 +109,27 @@ def table_frames():
         ],
         *[
             tr()[
-                td()[number(str(frame.id))],
-                td()[number(frame.format(frame.ts_delta, 3))],
+                td()[number(frame.display["id"])],
+                td()[number(frame.display["ts_delta"])],
                 td(align_items="flex_start")[div(gap=10, min_width=60)[
                     *[text(p["name"]) for p in frame.patterns]
                 ]],
                 # td(align_items="flex_start")[div(gap=8)[
                 #     *[text(", ".join(p["sounds"])) for p in frame.patterns]
                 # ]],
-                td()[number(frame.format(frame.power, 2))],
+                td()[number(frame.display["power"])],
                 td(align_items="flex_end")[div(gap=10)[
-                    *[number(frame.format(p["probability"], 4)) for p in frame.patterns]
+                    *[number(probability) for probability in frame.display["probabilities"]]
                 ]],
                 *[
                     td(align_items="flex_end", justify_content="center")[
-                        number(str(round(frame.f0))),
+                        number(frame.display["f0"]),
                     ],
                     td(align_items="flex_end", justify_content="center")[
-                        number(str(round(frame.f1))),
+                        number(frame.display["f1"]),
                     ],
                     td(align_items="flex_end", justify_content="center")[
-                        number(str(round(frame.f2))),
+                        number(frame.display["f2"]),
                     ],
                 ] if show_formants else [],
                 td(align_items="center")[div(gap=10, align_items="center")[
@@ -148,6 +152,10 @@ def page_frames():
 
     state = actions.user.ui_elements("state")
     capture_updating = state.get("capture_updating", False)
+    last_capture = state.get("last_capture", None)
+    total_frames = len(last_capture.frames) if last_capture else 0
+    timing_gaps = last_capture.timing_gaps if last_capture else []
+    missed_frames = sum(gap["missed"] for gap in timing_gaps)
 
     return div()[
         div(background_color=BG_DARKEST, flex_direction="row", height=750)[
@@ -158,8 +166,17 @@ def page_frames():
                 div(flex=1, position="relative")[
                     div(background_color=BG_DARK, border_color=BORDER_COLOR, border_bottom=1)[
                         div(flex_direction="row", padding=8, justify_content="space_between", align_items="center")[
-                            text("Frames", font_size=16),
-                            component(table_controls),
+                            div(flex_direction="row", gap=16, align_items="center")[
+                                text("Frames", font_size=16),
+                                text(
+                                    f"{len(timing_gaps)} timing gaps, {missed_frames} frames dropped in this capture",
+                                    color=THROTTLE_COLOR,
+                                ) if timing_gaps else None,
+                            ],
+                            div(flex_direction="row", gap=16, align_items="center")[
+                                table_window_controls("frames_window_start", total_frames),
+                                component(table_controls),
+                            ],
                         ],
                     ],
                     div(position="relative", flex=1)[
@@ -30,6 +30,11 @@ from ..parrot_integration_wrapper import (
     get_stats_pretty_print,
     format,
     format_stats_multiline,
+    update_noise_floor_state,
+)
+from ..parrot_integration_export import (
+    EXPORT_FORMATS,
+    export_session,
 )
 
 def icon_triangle_up():
@@ -119,6 +124,78 @@ def copy_button(name):
         ),
     ]
 
+def export_buttons():
+    div, text, button, icon, state = actions.user.ui_elements(["div", "text", "button", "icon", "state"])
+    export_status = state.get("export_status", {})
+    running = export_status.get("running", False)
+
+    if running:
+        total = export_status.get("total", 0)
+        percent = int(100 * export_status.get("rows", 0) / total) if total else 0
+        status_text = f"Exporting... {percent}%"
+    elif export_status.get("error"):
+        status_text = "Export failed"
+    elif export_status.get("path"):
+        status_text = "Exported"
+    else:
+        status_text = None
+
+    return div(flex_direction="row", gap=8, align_items="center")[
+        text(status_text, color=SECONDARY_COLOR) if status_text else None,
+        *[button(
+            on_click=lambda e, export_format=export_format: export_session(export_format),
+            disabled=running,
+            padding=8,
+            padding_left=12,
+            padding_right=12,
+            flex_direction="row",
+            align_items="center",
+            gap=4,
+            border_color=BORDER_COLOR,
+            border_width=1,
+            border_radius=4,
+        )[
+            text(f"Export {export_format.upper()}"),
+        ] for export_format in EXPORT_FORMATS],
+    ]
+
+noise_floor_job = None
+
+def start_noise_floor_refresh(e=None):
+    global noise_floor_job
+    update_noise_floor_state()
+    if noise_floor_job is None:
+        noise_floor_job = cron.interval("1s", update_noise_floor_state)
+
+def stop_noise_floor_refresh(e=None):
+    global noise_floor_job
+    if noise_floor_job is not None:
+        cron.cancel(noise_floor_job)
+        noise_floor_job = None
+
+def noise_floor():
+    div, text, state, effect = actions.user.ui_elements(["div", "text", "state", "effect"])
+    summary = state.get("noise_floor", None)
+
+    effect(start_noise_floor_refresh, stop_noise_floor_refresh, [])
+
+    if not summary or not summary["seen"]:
+        return div(padding=8)[
+            text("Noise floor: waiting for frames", color=SECONDARY_COLOR),
+        ]
+
+    power = " / ".join(format(value, 2) for value in summary["power"].values())
+    probability = " / ".join(format(value, 3) for value in summary["probability"].values())
+
+    return div(flex_direction="row", gap=16, align_items="center", padding=8)[
+        text("Noise floor p50 / p90 / p99", color=SECONDARY_COLOR),
+        text("Power"),
+        number(power),
+        text("Top pattern prob."),
+        number(probability),
+        text(f"({summary['seen']} frames, {summary['samples']} sampled for export)", color=SECONDARY_COLOR),
+    ]
+
 def table_stats():
     div, text, icon, style = actions.user.ui_elements(["div", "text", "icon", "style"])
     table, th, tr, td = actions.user.ui_elements(["table", "th", "tr", "td"])
@@ -158,8 +235,14 @@ def table_stats():
     return div(height="100%")[
         div(background_color=BG_DARK, border_color=BORDER_COLOR, border_bottom=1)[
             div(flex_direction="row", padding=8, justify_content="space_between", align_items="center")[
-                text("Statistics", font_size=16, margin_left=8),
-                component(table_controls),
+                div(flex_direction="row", gap=24, align_items="center")[
+                    text("Statistics", font_size=16, margin_left=8),
+                    component(noise_floor),
+                ],
+                div(flex_direction="row", gap=24, align_items="center")[
+                    component(export_buttons),
+                    component(table_controls),
+                ],
             ],
         ],
         div(flex_direction="row", height="100%", overflow_y="scroll", position="relative")[
@@ -0,0 +1,252 @@
+from talon import actions, cron
+from .components import rect_color
+from .colors import (
+    ACTIVE_COLOR,
+    BG_DARK,
+    BG_DARKEST,
+    BG_INPUT,
+    BORDER_COLOR,
+    GRAY_SOFT,
+    SECONDARY_COLOR,
+)
+from ..parrot_integration_controller import get_pattern_color
+from ..parrot_integration_wrapper import (
+    frame_history,
+    decimate_min_max,
+    minute_rollup,
+    ten_minute_rollup,
+)
+
+TIMELINE_WIDTH = 1000
+TIMELINE_POWER_HEIGHT = 220
+TIMELINE_PROBABILITY_HEIGHT = 300
+TIMELINE_COLUMNS = TIMELINE_WIDTH // 2
+TIMELINE_MAX_POWER = 30
+TIMELINE_REFRESH = "50ms"
+TIMELINE_SECONDS_OPTIONS = [5, 10, 30, 60]
+TIMELINE_MODES = {
+    "live": "Live",
+    "minute": "Per minute",
+    "ten_minute": "Per 10 min",
+}
+ROLLUPS = {
+    "minute": minute_rollup,
+    "ten_minute": ten_minute_rollup,
+}
+
+timeline_job = None
+
+def rollup_signature(rollup) -> tuple | None:
+    if not rollup.buckets:
+        return None
+    last = rollup.buckets[-1]
+    return (len(rollup.buckets), last["key"], sum(entry["count"] for entry in list(last["patterns"].values())))
+
+def refresh_timeline():
+    mode = actions.user.ui_elements_get_state("timeline_mode") or "live"
+    if mode in ROLLUPS:
+        # Rollups change at most once per detection, skip redraws otherwise
+        signature = rollup_signature(ROLLUPS[mode])
+        if signature != actions.user.ui_elements_get_state("timeline_rollup_signature"):
+            actions.user.ui_elements_set_state("timeline_rollup_signature", signature)
+        return
+
+    last_ts = frame_history.last_ts()
+    if last_ts != actions.user.ui_elements_get_state("timeline_last_ts"):
+        actions.user.ui_elements_set_state("timeline_last_ts", last_ts)
+
+def start_timeline_refresh(e=None):
+    global timeline_job
+    if timeline_job is None:
+        timeline_job = cron.interval(TIMELINE_REFRESH, refresh_timeline)
+
+def stop_timeline_refresh(e=None):
+    global timeline_job
+    if timeline_job is not None:
+        cron.cancel(timeline_job)
+        timeline_job = None
+
+def power_path(power_min: list, power_max: list) -> str:
+    """Vertical min-max segment per column."""
+    x_step = TIMELINE_WIDTH / max(len(power_min), 1)
+    segments = []
+    for column, (low, high) in enumerate(zip(power_min, power_max)):
+        if high is None:
+            continue
+        x = round(column * x_step, 1)
+        y_high = round(TIMELINE_POWER_HEIGHT * (1 - min(TIMELINE_MAX_POWER, high) / TIMELINE_MAX_POWER), 1)
+        y_low = round(TIMELINE_POWER_HEIGHT * (1 - min(TIMELINE_MAX_POWER, low) / TIMELINE_MAX_POWER), 1)
+        segments.append(f"M{x} {y_high}L{x} {max(y_low, y_high + 1)}")
+    return "".join(segments)
+
+def probability_path(values: list, scale: float = 1.0) -> str:
+    x_step = TIMELINE_WIDTH / max(len(values), 1)
+    points = [
+        f"{round(column * x_step, 1)} {round(TIMELINE_PROBABILITY_HEIGHT * (1 - value / scale), 1)}"
+        for column, value in enumerate(values)
+    ]
+    return "M" + "L".join(points) if points else ""
+
+def segmented_tabs(options: dict, selected, on_select):
+    div, button, text = actions.user.ui_elements(["div", "button", "text"])
+
+    return div(
+        flex_direction="row",
+        align_items="flex_end",
+        background_color=BG_INPUT,
+        border_color=BORDER_COLOR,
+        border_width=1,
+    )[
+        *[button(
+            on_click=lambda e, value=value: on_select(value),
+            padding=12,
+            padding_top=6,
+            padding_bottom=6,
+            position="relative",
+        )[
+            text(label, color="FFFFFF"),
+            div(
+                position="absolute",
+                bottom=0,
+                background_color=ACTIVE_COLOR,
+                height=3,
+                width="100%",
+                border_radius=2,
+            ) if selected == value else None
+        ] for value, label in options.items()]
+    ]
+
+def timeline_tabs():
+    div, state = actions.user.ui_elements(["div", "state"])
+    mode, set_mode = state.use("timeline_mode", "live")
+    seconds, set_seconds = state.use("timeline_seconds", 10)
+
+    return div(flex_direction="row", gap=16, align_items="center")[
+        segmented_tabs({value: f"{value}s" for value in TIMELINE_SECONDS_OPTIONS}, seconds, set_seconds) if mode == "live" else None,
+        segmented_tabs(TIMELINE_MODES, mode, set_mode),
+    ]
+
+def pattern_legend(colors: dict):
+    div, text = actions.user.ui_elements(["div", "text"])
+
+    return div(flex_direction="row", gap=16, flex_wrap=True)[
+        *[div(flex_direction="row", gap=8, align_items="center")[
+            rect_color(color, size=10),
+            text(name),
+        ] for name, color in colors.items()],
+    ]
+
+def rollup_chart():
+    div, text, state = actions.user.ui_elements(["div", "text", "state"])
+    svg, path = actions.user.ui_elements_svg(["svg", "path"])
+    mode = state.get("timeline_mode", "live")
+    state.get("timeline_rollup_signature", None)
+    rollup = ROLLUPS[mode]
+    series = rollup.series()
+
+    if not series:
+        return div(padding=16)[
+            text("Waiting for detections...", color=GRAY_SOFT),
+        ]
+
+    # One column per stored bucket, so the chart stays within max_buckets even when
+    # frame time jumps forward after a pause or backwards on a restart
+    columns = len(series)
+    power_min = [None] * columns
+    power_max = [None] * columns
+    counts: dict[str, list[int]] = {}
+    for column, bucket in enumerate(series):
+        # Copied in one step, the analytics worker may add a pattern meanwhile
+        for name, entry in list(bucket["patterns"].items()):
+            if entry["count"]:
+                low = entry["power"]["min"]
+                high = entry["power"]["max"]
+                if power_min[column] is None or low < power_min[column]:
+                    power_min[column] = low
+                if power_max[column] is None or high > power_max[column]:
+                    power_max[column] = high
+            counts.setdefault(name, [0] * columns)[column] = entry["count"]
+
+    max_count = max((max(values) for values in counts.values()), default=0) or 1
+    colors = {name: get_pattern_color(name) for name in counts}
+    bucket_label = "minute" if mode == "minute" else "10 minutes"
+
+    return div(flex_direction="column", gap=16, padding=16)[
+        text(f"Detected power range per {bucket_label}", color=SECONDARY_COLOR),
+        div(background_color=BG_DARKEST, border_width=1, border_color=BORDER_COLOR)[
+            svg(width=TIMELINE_WIDTH, height=TIMELINE_POWER_HEIGHT, view_box=f"0 0 {TIMELINE_WIDTH} {TIMELINE_POWER_HEIGHT}")[
+                path(
+                    d=power_path(power_min, power_max),
+                    stroke="#DDDDDD",
+                    stroke_width=max(1, TIMELINE_WIDTH / columns - 1),
+                ),
+            ],
+        ],
+        text(f"Detections per {bucket_label} (max {max_count})", color=SECONDARY_COLOR),
+        div(background_color=BG_DARKEST, border_width=1, border_color=BORDER_COLOR)[
+            svg(width=TIMELINE_WIDTH, height=TIMELINE_PROBABILITY_HEIGHT, view_box=f"0 0 {TIMELINE_WIDTH} {TIMELINE_PROBABILITY_HEIGHT}")[
+                *[path(
+                    d=probability_path(values, max_count),
+                    stroke=colors[name],
+                    stroke_width=1.5,
+                    fill="none",
+                ) for name, values in counts.items()],
+            ],
+        ],
+        pattern_legend(colors),
+    ]
+
+def timeline_chart():
+    div, text, state = actions.user.ui_elements(["div", "text", "state"])
+    svg, path = actions.user.ui_elements_svg(["svg", "path"])
+    last_ts = state.get("timeline_last_ts", None)
+    seconds = state.get("timeline_seconds", 10)
+
+    if last_ts is None:
+        return div(padding=16)[
+            text("Waiting for frames...", color=GRAY_SOFT),
+        ]
+
+    decimated = decimate_min_max(last_ts - seconds, last_ts, TIMELINE_COLUMNS)
+
+    return div(flex_direction="column", gap=16, padding=16)[
+        text("Power", color=SECONDARY_COLOR),
+        div(background_color=BG_DARKEST, border_width=1, border_color=BORDER_COLOR)[
+            svg(width=TIMELINE_WIDTH, height=TIMELINE_POWER_HEIGHT, view_box=f"0 0 {TIMELINE_WIDTH} {TIMELINE_POWER_HEIGHT}")[
+                path(
+                    d=power_path(decimated["power_min"], decimated["power_max"]),
+                    stroke="#DDDDDD",
+                    stroke_width=TIMELINE_WIDTH / TIMELINE_COLUMNS,
+                ),
+            ],
+        ],
+        text("Probability", color=SECONDARY_COLOR),
+        div(background_color=BG_DARKEST, border_width=1, border_color=BORDER_COLOR)[
+            svg(width=TIMELINE_WIDTH, height=TIMELINE_PROBABILITY_HEIGHT, view_box=f"0 0 {TIMELINE_WIDTH} {TIMELINE_PROBABILITY_HEIGHT}")[
+                *[path(
+                    d=probability_path(values),
+                    stroke=decimated["colors"][name],
+                    stroke_width=1.5,
+                    fill="none",
+                ) for name, values in decimated["probabilities"].items()],
+            ],
+        ],
+        pattern_legend(decimated["colors"]),
+    ]
+
+def page_timeline():
+    div, component, text, state = actions.user.ui_elements(["div", "component", "text", "state"])
+    effect = actions.user.ui_elements("effect")
+    mode = state.get("timeline_mode", "live")
+
+    effect(start_timeline_refresh, stop_timeline_refresh, [])
+
+    return div(background_color=BG_DARKEST, flex_direction="column", height=750)[
+        div(background_color=BG_DARK, border_color=BORDER_COLOR, border_bottom=1)[
+            div(flex_direction="row", padding=8, justify_content="space_between", align_items="center")[
+                text("Timeline", font_size=16, margin_left=8),
+                timeline_tabs(),
+            ],
+        ],
+        component(rollup_chart) if mode in ROLLUPS else component(timeline_chart),
+    ]
\ No newline at end of file